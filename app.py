@@ -1,20 +1,25 @@
 # app.py
-from src.graph import app
-from src.pdf_generator import create_pdf
+from src.graph import app, run_analysis_many
+from src.tools.market_data import fetch_snapshot
+from src.tools.symbols import get_symbol_index, yahoo_spellings
+import argparse
 import sys
 import os
-import tkinter as tk
-from tkinter import filedialog
+import time
 
 def get_save_path(ticker):
     """
     Opens a system file dialog to choose the save location for the report.
-    This provides a professional user experience.
+    Opt-in (--dialog): needs a desktop session, so it is never used by default.
     """
+    # Imported here so startup does not pay for Tk before a ticker is entered
+    import tkinter as tk
+    from tkinter import filedialog
+
     root = tk.Tk()
     root.withdraw()  # Hide the main tkinter window
     root.attributes("-topmost", True) # Bring the dialog to the front
-    
+
     default_filename = f"{ticker}_Investment_Report.pdf"
     file_path = filedialog.asksaveasfilename(
         initialfile=default_filename,
@@ -25,70 +30,246 @@ def get_save_path(ticker):
     root.destroy()
     return file_path
 
-def main():
+def clean_ticker(raw, check=True):
+    """
+    The symbol for user input: a symbol ('brk.b' -> 'BRK-B') or a company
+    name ('XP Inc' -> 'XP'), looked up in the local symbol index. Input not
+    in the index (^GSPC, BTC-USD, PETR4.SA, or anything while the index is
+    being built) is checked with Yahoo. Returns None for unknown symbols.
+    With check=False, such input is returned as typed if it can be a symbol,
+    and the caller's own download decides whether it exists.
+    """
+    raw = raw.strip()
+    if not raw:
+        return ""
+    index = get_symbol_index()
+    symbol = index.resolve(raw) if index is not None else None
+    if symbol:
+        return symbol
+    spellings = yahoo_spellings(raw)
+    if not check:
+        return spellings[0] if spellings else None
+    return next((s for s in spellings if fetch_snapshot(s).is_valid), None)
+
+def unknown_ticker_message(raw):
+    index = get_symbol_index()
+    suggestions = index.suggest(raw) if index else []
+    hint = f" Did you mean {', '.join(suggestions)}?" if suggestions else ""
+    return f"Unknown ticker '{raw.strip()}'.{hint}"
+
+def read_tickers(args):
+    """
+    Tickers from the command line plus --file (one per line or comma
+    separated, '#' starts a comment), de-duplicated in order.
+    Returns (tickers, unknown entries). Symbols outside the index are not
+    fetched one by one here: the batch's bulk download reports those
+    without data.
+    """
+    raw = list(args.tickers)
+    if args.file:
+        with open(args.file, encoding="utf-8") as f:
+            for line in f:
+                raw.extend(line.split("#", 1)[0].split(","))
+    tickers, unknown = [], []
+    for entry in (r.strip() for r in raw):
+        if not entry:
+            continue
+        symbol = clean_ticker(entry, check=False)
+        if symbol:
+            tickers.append(symbol)
+        else:
+            unknown.append(entry)
+    return list(dict.fromkeys(tickers)), unknown
+
+def report_path(output_dir, ticker):
+    return os.path.join(output_dir, f"{ticker}_Investment_Report.pdf")
+
+def open_file(path):
+    # Automatically open the PDF for the user
+    if sys.platform == 'win32':
+        os.startfile(path)
+    elif sys.platform == 'darwin': # Mac
+        os.system(f'open "{path}"')
+
+def stage_seconds(spans, name):
+    return sum(s["duration_ms"] for s in spans if s["name"] == name) / 1000
+
+def print_summary(rows, elapsed):
+    """
+    One line per ticker with per-stage timings, then batch totals.
+    """
+    header = f"{'TICKER':<8} {'STATUS':<7} {'RESEARCH':>8} {'ANALYST':>8} {'WRITER':>8} {'PDF':>6} {'DONE AT':>8}  OUTPUT"
+    print("\n" + "="*len(header))
+    print(header)
+    print("-"*len(header))
+    for r in rows:
+        if r["error"]:
+            print(f"{r['ticker']:<8} {'FAILED':<7} {'':>8} {'':>8} {'':>8} {'':>6} {r['done']:>7.1f}s  {r['error']}")
+            continue
+        print(
+            f"{r['ticker']:<8} {'OK':<7} {r['researcher']:>7.1f}s {r['analyst']:>7.1f}s "
+            f"{r['writer']:>7.1f}s {r['pdf']:>5.1f}s {r['done']:>7.1f}s  {r['path']}"
+        )
+    ok = sum(1 for r in rows if not r["error"])
+    print("-"*len(header))
+    print(f"{ok}/{len(rows)} reports in {elapsed:.1f}s ({ok / elapsed * 60:.1f} reports/min)")
+    print("="*len(header))
+
+def run_batch(tickers, args):
+    """
+    Runs the pipeline for every ticker in parallel and writes one PDF each.
+    Returns the process exit code (1 if any ticker failed).
+    """
+    from src.pdf_generator import create_pdf
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    print(f"🚀 AI Investment Committee: {len(tickers)} tickers, concurrency {args.concurrency}")
+    start = time.perf_counter()
+    rows = []
+
+    results = run_analysis_many(
+        tickers, max_workers=args.concurrency, period=args.period, interval=args.interval
+    )
+    for result in results:
+        ticker = result["ticker"]
+        row = {"ticker": ticker, "error": result.get("error")}
+        if not row["error"] and not result.get("final_report"):
+            row["error"] = "The agents failed to generate a report."
+        if not row["error"]:
+            spans = result.get("telemetry", [])
+            row.update({name: stage_seconds(spans, name) for name in ("researcher", "analyst", "writer")})
+            pdf_start = time.perf_counter()
+            try:
+                row["path"] = create_pdf(
+                    ticker, result["final_report"], report_path(args.output_dir, ticker), result["chart_png"]
+                )
+            except Exception as e:
+                row["error"] = f"PDF error: {e}"
+            row["pdf"] = time.perf_counter() - pdf_start
+        row["done"] = time.perf_counter() - start
+        status = f"❌ {row['error']}" if row["error"] else f"✅ {row['path']}"
+        print(f"[{len(rows) + 1}/{len(tickers)}] {ticker}: {status}")
+        rows.append(row)
+
+    print_summary(rows, time.perf_counter() - start)
+    return 1 if any(r["error"] for r in rows) else 0
+
+def run_interactive(args):
+    """
+    Original single-ticker flow: prompts for a ticker and streams the report.
+    """
     print("🚀 AI Investment Committee initialized...")
-    
+
     # 1. User Input and Cleanup
-    ticker_input = input("Enter a stock ticker (e.g., AAPL, TSLA, PAGS): ").upper()
-    # Basic cleanup to handle common entry errors (like 'XP Inc' or 'XP.')
-    ticker = ticker_input.replace(" INC", "").replace(".", "").strip()
-    
-    if not ticker:
+    raw = input("Enter a stock ticker or company name (e.g., AAPL, TSLA, PAGS): ")
+    ticker = clean_ticker(raw)
+
+    if ticker == "":
         print("❌ Error: Ticker is required.")
-        return
+        return 1
+    if ticker is None:
+        print(f"❌ Error: {unknown_ticker_message(raw)}")
+        return 1
 
     # 2. Execute the Multi-Agent Graph
     print(f"\n--- STARTING ANALYSIS FOR {ticker} ---\n")
-    initial_state = {"ticker": ticker, "messages": []}
-    
+    initial_state = {"ticker": ticker, "period": args.period, "interval": args.interval, "messages": []}
+
     try:
-        # This triggers the Researcher, Analyst, and Writer in sequence/parallel
-        result = app.invoke(initial_state)
+        # This triggers the Researcher and Analyst in parallel, then the Writer.
+        # 3. The report is printed to the console token by token as it is written
+        result = {}
+        printed = 0
+        for chunk in app.stream(initial_state, stream_tokens=True):
+            for node, output in chunk.items():
+                if "partial_report" not in output:
+                    result.update(output)
+                    continue
+                if printed == 0:
+                    print("\n" + "="*50)
+                    print("       FINAL INVESTMENT REPORT")
+                    print("="*50 + "\n")
+                text = output["partial_report"]
+                print(text[printed:], end="", flush=True)
+                printed = len(text)
+        print()
+
         report_content = result.get("final_report", "")
-        chart_path = result.get("chart_path", "") # Path to the .png generated by the Analyst
-        
+        if report_content and printed == 0:
+            # Reused report (nothing material changed): there were no tokens to stream
+            print("\n" + "="*50)
+            print("       FINAL INVESTMENT REPORT")
+            print("="*50 + "\n")
+            print(report_content)
+        chart_png = result.get("chart_png", b"") # In-memory .png generated by the Analyst
+
         if not report_content:
             print("❌ Error: The agents failed to generate a report.")
-            return
+            return 1
 
-        # 3. Display Markdown Report in Console (for immediate feedback)
-        print("\n" + "="*50)
-        print("       FINAL INVESTMENT REPORT")
-        print("="*50 + "\n")
-        print(report_content)
-        
         # 4. Save to PDF (The Final Product)
         print("\n" + "="*50)
-        print(f"📄 SELECT SAVE LOCATION FOR {ticker}...")
-        
-        save_path = get_save_path(ticker)
-        
-        if not save_path:
-            print("⚠️ Save cancelled by user. PDF not generated.")
-            # Clean up the temporary chart if the user cancels
-            if chart_path and os.path.exists(chart_path):
-                os.remove(chart_path)
-            return
+        if args.dialog:
+            print(f"📄 SELECT SAVE LOCATION FOR {ticker}...")
+            save_path = get_save_path(ticker)
+            if not save_path:
+                print("⚠️ Save cancelled by user. PDF not generated.")
+                return 0
+        else:
+            os.makedirs(args.output_dir, exist_ok=True)
+            save_path = report_path(args.output_dir, ticker)
 
         # Create the professional PDF with the embedded chart
-        create_pdf(ticker, report_content, save_path, chart_path)
-        
+        from src.pdf_generator import create_pdf
+        create_pdf(ticker, report_content, save_path, chart_png)
+
         print(f"✅ SUCCESS! Report saved at:\n👉 {save_path}")
         print("="*50)
-        
-        # 5. Cleanup & Post-processing
-        # Delete the temporary chart image file so it doesn't clutter the root folder
-        if chart_path and os.path.exists(chart_path):
-            os.remove(chart_path)
-            
-        # Automatically open the PDF for the user
-        if sys.platform == 'win32':
-            os.startfile(save_path)
-        elif sys.platform == 'darwin': # Mac
-            os.system(f'open "{save_path}"')
-            
+
+        # 5. Post-processing
+        open_file(save_path)
+        return 0
+
     except Exception as e:
         print(f"❌ Critical Error during execution: {str(e)}")
+        return 1
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="AI Investment Committee: equity research reports as PDF.",
+        epilog="With no tickers, prompts for one interactively. "
+               "Example: python app.py AAPL NVDA MSFT -o reports -j 4",
+    )
+    parser.add_argument("tickers", nargs="*", help="ticker symbols to analyze")
+    parser.add_argument("-f", "--file", help="file with tickers (one per line or comma separated, '#' comments)")
+    parser.add_argument("-o", "--output-dir", default="reports", help="directory for the PDFs (default: reports)")
+    parser.add_argument("-j", "--concurrency", type=int, default=4, help="tickers analyzed in parallel (default: 4)")
+    parser.add_argument("--period", help="history window, e.g. 6mo, 1y, 5y (default: HISTORY_PERIOD or 1mo)")
+    parser.add_argument("--interval", help="bar size, e.g. 1d, 1wk (default: HISTORY_INTERVAL or 1d)")
+    parser.add_argument("--dialog", action="store_true", help="interactive mode: choose the save path in a file dialog")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.concurrency < 1:
+        print("❌ Error: --concurrency must be at least 1.")
+        return 2
+    if not args.tickers and not args.file:
+        return run_interactive(args)
+
+    try:
+        tickers, unknown = read_tickers(args)
+    except OSError as e:
+        print(f"❌ Error reading ticker file: {e}")
+        return 2
+    # Names the index does not know are rejected here, before any data is fetched
+    for raw in unknown:
+        print(f"❌ {unknown_ticker_message(raw)} Skipped.")
+    if not tickers:
+        print("❌ Error: No valid tickers given.")
+        return 2
+    code = run_batch(tickers, args)
+    return 1 if unknown else code
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,244 @@
+# scripts/benchmark.py
+"""
+Offline benchmark for the report pipeline.
+
+Runs run_analysis, LegacyAppAdapter.stream and create_pdf against the fake
+providers in scripts/fake_providers.py (no network, no API quota) and
+reports per-stage p50/p95 latency, reports per minute at each concurrency
+level and peak memory. Results are written to a JSON file tagged with the
+current commit, so runs can be compared across commits.
+
+Usage (from the repository root):
+    python -m scripts.benchmark
+    python -m scripts.benchmark --concurrency 1 4 16 --reports 32 --groq-latency 1.5
+    python -m scripts.benchmark --baseline .cache/benchmarks/<previous>.json
+
+Caches are disabled by default so every report does the full work; pass
+--warm to keep them (repeat runs then measure the cached path). The Groq
+quota limiter is lifted unless GROQ_RPM_LIMIT / GROQ_TPM_LIMIT are set.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+OUTPUT_DIR = os.path.join(".cache", "benchmarks")
+
+# Spans summarized per level (stages first, then the external calls)
+STAGES = [
+    "researcher", "analyst", "writer",
+    "ddgs.search", "yfinance.history", "yfinance.info", "price_store.get",
+    "mplfinance.render", "groq.completion",
+]
+
+
+def configure_env(warm: bool):
+    """
+    Must run before src is imported: the modules read their settings at import time.
+    """
+    if not warm:
+        os.environ.setdefault("LLM_CACHE_TTL", "0")
+        os.environ.setdefault("SEARCH_CACHE_TTL", "0")
+        os.environ.setdefault("PRICE_STORE_PATH", "")
+        os.environ.setdefault("CHART_CACHE_MB", "0")
+        os.environ.setdefault("REFRESH_TTL", "0")
+    os.environ.setdefault("GROQ_RPM_LIMIT", "1000000")
+    os.environ.setdefault("GROQ_TPM_LIMIT", "1000000000")
+    os.environ.setdefault("TELEMETRY_LOG", "")
+
+
+def percentiles(values: list) -> dict:
+    if not values:
+        return {"n": 0, "p50_ms": None, "p95_ms": None}
+    return {
+        "n": len(values),
+        "p50_ms": round(float(np.percentile(values, 50)), 1),
+        "p95_ms": round(float(np.percentile(values, 95)), 1),
+    }
+
+
+def run_one(mode: str, ticker: str):
+    """
+    Produces one report; returns (end-to-end ms, spans).
+    """
+    from src.graph import app, run_analysis
+
+    start = time.perf_counter()
+    if mode == "run_analysis":
+        spans = run_analysis(ticker)["telemetry"]
+    else:
+        spans = []
+        for chunk in app.stream({"ticker": ticker}, stream_tokens=True):
+            spans = chunk.get("writer", {}).get("telemetry", spans)
+    return (time.perf_counter() - start) * 1000, spans
+
+
+def bench_level(mode: str, concurrency: int, reports: int, offset: int) -> dict:
+    tickers = [f"BM{offset + i:04d}" for i in range(reports)]
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda t: run_one(mode, t), tickers))
+    wall = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+
+    by_stage = {name: [] for name in STAGES}
+    for _, spans in results:
+        for s in spans:
+            if s["name"] in by_stage:
+                by_stage[s["name"]].append(s["duration_ms"])
+    first_token = [s["first_token_ms"] for _, spans in results for s in spans if "first_token_ms" in s]
+
+    return {
+        "mode": mode,
+        "concurrency": concurrency,
+        "reports": reports,
+        "wall_s": round(wall, 2),
+        "reports_per_min": round(reports / wall * 60, 1),
+        "report": percentiles([ms for ms, _ in results]),
+        "stages": {name: percentiles(v) for name, v in by_stage.items() if v},
+        "first_token": percentiles(first_token),
+        "peak_traced_mb": round(peak / 2**20, 1),
+    }
+
+
+def bench_pdf(runs: int) -> dict:
+    from scripts.fake_providers import FakeGroq, ProviderProfile, make_history
+    from src.pdf_generator import create_pdf
+    from src.tools.charts import render_chart
+
+    report = "".join(FakeGroq(ProviderProfile())._report())
+    chart = render_chart("PDF", make_history("PDF", 60))
+
+    timings, size = [], 0
+    tracemalloc.reset_peak()
+    for _ in range(runs):
+        start = time.perf_counter()
+        size = len(create_pdf("PDF", report, None, chart))
+        timings.append((time.perf_counter() - start) * 1000)
+    _, peak = tracemalloc.get_traced_memory()
+    return {"runs": runs, "bytes": size, **percentiles(timings), "peak_traced_mb": round(peak / 2**20, 1)}
+
+
+def git_commit() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True)
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT, capture_output=True, text=True)
+        return out.stdout.strip() + ("-dirty" if dirty.stdout.strip() else "")
+    except OSError:
+        return "unknown"
+
+
+def print_level(level: dict, baseline: dict = None):
+    print(
+        f"\n[{level['mode']}] concurrency {level['concurrency']}: "
+        f"{level['reports_per_min']} reports/min, report p50 {level['report']['p50_ms']} ms, "
+        f"p95 {level['report']['p95_ms']} ms, peak {level['peak_traced_mb']} MB"
+    )
+    print(f"  {'stage':<20}{'p50 ms':>10}{'p95 ms':>10}{'Δp50':>10}")
+    for name, stats in level["stages"].items():
+        delta = ""
+        if baseline and name in baseline["stages"] and baseline["stages"][name]["p50_ms"]:
+            delta = f"{(stats['p50_ms'] / baseline['stages'][name]['p50_ms'] - 1) * 100:+.0f}%"
+        print(f"  {name:<20}{stats['p50_ms']:>10}{stats['p95_ms']:>10}{delta:>10}")
+    if baseline:
+        change = (level["reports_per_min"] / baseline["reports_per_min"] - 1) * 100
+        print(f"  throughput vs baseline: {change:+.0f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", nargs="+", default=["run_analysis", "stream"], choices=["run_analysis", "stream"])
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 4, 8])
+    parser.add_argument("--reports", type=int, default=8, help="reports per concurrency level")
+    parser.add_argument("--pdf-runs", type=int, default=10)
+    parser.add_argument("--warm", action="store_true", help="keep the caches enabled")
+    parser.add_argument("--output", help=f"result file (default: {OUTPUT_DIR}/<timestamp>-<commit>.json)")
+    parser.add_argument("--baseline", help="previous result file to compare against")
+    # Fake provider profile
+    parser.add_argument("--yahoo-latency", type=float, default=0.15)
+    parser.add_argument("--search-latency", type=float, default=0.4)
+    parser.add_argument("--groq-latency", type=float, default=0.6, help="seconds to first token")
+    parser.add_argument("--groq-tokens-per-s", type=float, default=250.0)
+    parser.add_argument("--bars", type=int, default=22, help="OHLCV rows per history call")
+    parser.add_argument("--news-results", type=int, default=10)
+    parser.add_argument("--news-chars", type=int, default=300)
+    parser.add_argument("--summary-chars", type=int, default=1500)
+    parser.add_argument("--report-tokens", type=int, default=900)
+    parser.add_argument("--jitter", type=float, default=0.2)
+    args = parser.parse_args()
+
+    configure_env(args.warm)
+    sys.path.insert(0, ROOT)
+    from scripts.fake_providers import ProviderProfile, install
+
+    profile = install(ProviderProfile(
+        yahoo_latency=args.yahoo_latency, search_latency=args.search_latency,
+        groq_latency=args.groq_latency, groq_tokens_per_s=args.groq_tokens_per_s,
+        bars=args.bars, news_results=args.news_results, news_chars=args.news_chars,
+        summary_chars=args.summary_chars, report_tokens=args.report_tokens, jitter=args.jitter,
+    ))
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = {(lvl["mode"], lvl["concurrency"]): lvl for lvl in json.load(f)["levels"]}
+
+    # One untimed report first: lazy imports (matplotlib, fpdf2) are a one-off cost
+    with contextlib.redirect_stdout(io.StringIO()):
+        run_one(args.modes[0], "WARMUP")
+
+    tracemalloc.start()
+    levels, offset = [], 0
+    for mode in args.modes:
+        for concurrency in args.concurrency:
+            print(f"Running {mode} x{args.reports} at concurrency {concurrency}...", flush=True)
+            # Silence the pipeline's progress prints; results are printed below
+            with contextlib.redirect_stdout(io.StringIO()):
+                level = bench_level(mode, concurrency, args.reports, offset)
+            offset += args.reports
+            levels.append(level)
+            print_level(level, (baseline or {}).get((mode, concurrency)))
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        pdf = bench_pdf(args.pdf_runs)
+    tracemalloc.stop()
+    print(f"\n[create_pdf] p50 {pdf['p50_ms']} ms, p95 {pdf['p95_ms']} ms, {pdf['bytes'] // 1024} KB")
+
+    # ru_maxrss is KB on Linux, bytes on macOS
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_rss_mb = max_rss / (2**20 if sys.platform == "darwin" else 2**10)
+    print(f"Peak RSS: {peak_rss_mb:.0f} MB")
+
+    commit = git_commit()
+    result = {
+        "commit": commit,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "warm_caches": args.warm,
+        "profile": profile.as_dict(),
+        "levels": levels,
+        "create_pdf": pdf,
+        "peak_rss_mb": round(peak_rss_mb, 1),
+    }
+    output = args.output or os.path.join(OUTPUT_DIR, f"{datetime.now():%Y%m%d-%H%M%S}-{commit}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    print(f"✅ Results saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+# scripts/fake_providers.py
+"""
+Offline stand-ins for Yahoo Finance, DuckDuckGo and Groq.
+
+They mimic the parts of yfinance, duckduckgo_search and the Groq SDK that
+the pipeline uses, with configurable latency and payload size, and never
+touch the network. install() swaps them in:
+
+    from scripts.fake_providers import ProviderProfile, install
+    install(ProviderProfile(groq_latency=0.8, bars=250))
+
+Swap in before the pipeline runs: src imports yfinance / duckduckgo_search
+lazily, so the stand-ins registered in sys.modules are what it picks up.
+"""
+import random
+import sys
+import time
+import types
+import zlib
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+REPORT_SECTIONS = [
+    "Executive Summary", "Company Profile", "Market Analysis",
+    "Quantitative Data", "Risk Factors", "Legal Notice",
+]
+
+
+class ProviderProfile:
+    """
+    Latency (seconds, before jitter) and payload size of each fake provider.
+    """
+
+    def __init__(self, yahoo_latency=0.15, search_latency=0.4, groq_latency=0.6, groq_tokens_per_s=250.0,
+                 bars=22, news_results=10, news_chars=300, summary_chars=1500, report_tokens=900,
+                 jitter=0.2, seed=0):
+        self.yahoo_latency = yahoo_latency
+        self.search_latency = search_latency
+        self.groq_latency = groq_latency              # time to first token
+        self.groq_tokens_per_s = groq_tokens_per_s    # generation speed after that
+        self.bars = bars                              # OHLCV rows per history call
+        self.news_results = news_results              # raw results per search
+        self.news_chars = news_chars                  # body length per result
+        self.summary_chars = summary_chars            # longBusinessSummary length
+        self.report_tokens = report_tokens            # completion length
+        self.jitter = jitter                          # +/- fraction applied to every latency
+        self._rng = random.Random(seed)
+
+    def sleep(self, seconds: float):
+        if seconds > 0:
+            time.sleep(seconds * self._rng.uniform(1 - self.jitter, 1 + self.jitter))
+
+    def as_dict(self) -> dict:
+        return {k: v for k, v in vars(self).items() if not k.startswith("_")}
+
+
+def _filler(chars: int, word: str = "lorem") -> str:
+    return " ".join([word] * max(chars // (len(word) + 1), 1))
+
+
+def make_history(ticker: str, bars: int) -> pd.DataFrame:
+    """
+    Deterministic random-walk daily OHLCV bars ending today (New York time).
+    """
+    rng = np.random.default_rng(zlib.crc32(ticker.encode()))
+    index = pd.bdate_range(end=pd.Timestamp.now(tz="America/New_York").normalize(), periods=bars, name="Date")
+    close = 100 + rng.standard_normal(bars).cumsum()
+    open_ = close + rng.standard_normal(bars) * 0.5
+    return pd.DataFrame({
+        "Open": open_,
+        "High": np.maximum(open_, close) + 1,
+        "Low": np.minimum(open_, close) - 1,
+        "Close": close,
+        "Volume": rng.integers(1_000_000, 5_000_000, bars),
+        "Dividends": 0.0,
+        "Stock Splits": 0.0,
+    }, index=index)
+
+
+# --- YAHOO (yfinance) ---
+class FakeTicker:
+    def __init__(self, ticker: str, profile: ProviderProfile):
+        self.ticker = ticker
+        self._profile = profile
+
+    def history(self, period=None, interval="1d", start=None, **kwargs) -> pd.DataFrame:
+        self._profile.sleep(self._profile.yahoo_latency)
+        return make_history(self.ticker, self._profile.bars)
+
+    @property
+    def info(self) -> dict:
+        self._profile.sleep(self._profile.yahoo_latency)
+        return {
+            "longName": f"{self.ticker} Holdings Inc.",
+            "sector": "Technology",
+            "longBusinessSummary": _filler(self._profile.summary_chars, "business"),
+        }
+
+
+def fake_yfinance(profile: ProviderProfile) -> types.ModuleType:
+    module = types.ModuleType("yfinance")
+    module.Ticker = lambda ticker: FakeTicker(ticker, profile)
+
+    def download(tickers, period=None, interval="1d", group_by="ticker", **kwargs):
+        # One round trip for the whole list, like the real bulk endpoint
+        profile.sleep(profile.yahoo_latency)
+        tickers = [tickers] if isinstance(tickers, str) else list(tickers)
+        return pd.concat(
+            {t: make_history(t, profile.bars).drop(columns=["Dividends", "Stock Splits"]) for t in tickers},
+            axis=1,
+        )
+
+    module.download = download
+    return module
+
+
+# --- DUCKDUCKGO ---
+def fake_duckduckgo_search(profile: ProviderProfile) -> types.ModuleType:
+    class DDGS:
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def text(self, query, max_results=10):
+            profile.sleep(profile.search_latency)
+            return [
+                {
+                    "title": f"{query.split()[0]} story {i}: analysts weigh quarter number {i}",
+                    "href": f"https://news.example.com/{zlib.crc32(query.encode())}/{i}",
+                    "body": _filler(profile.news_chars, "news"),
+                }
+                for i in range(min(max_results, profile.news_results))
+            ]
+
+    module = types.ModuleType("duckduckgo_search")
+    module.DDGS = DDGS
+    return module
+
+
+# --- GROQ ---
+class FakeGroq:
+    """
+    Sync client with chat.completions.create(model, messages, stream=False, ...).
+    """
+
+    def __init__(self, profile: ProviderProfile):
+        self._profile = profile
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _report(self) -> list:
+        # ~4 characters per token, split evenly across the expected sections
+        per_section = max(self._profile.report_tokens // len(REPORT_SECTIONS), 1)
+        tokens = []
+        for section in REPORT_SECTIONS:
+            tokens += [f"### {section}\n"] + ["word "] * per_section + ["\n\n"]
+        return tokens
+
+    def _create(self, model=None, messages=None, stream=False, **kwargs):
+        prompt_tokens = len(messages[-1]["content"]) // 4 if messages else 0
+        tokens = self._report()
+        usage = SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=len(tokens))
+        self._profile.sleep(self._profile.groq_latency)
+        if not stream:
+            self._profile.sleep(len(tokens) / self._profile.groq_tokens_per_s)
+            return SimpleNamespace(
+                choices=[SimpleNamespace(message=SimpleNamespace(content="".join(tokens)))], usage=usage
+            )
+        return self._stream(tokens, usage)
+
+    def _stream(self, tokens: list, usage):
+        # A chunk every ~8 tokens keeps the sleep overhead negligible
+        for i in range(0, len(tokens), 8):
+            self._profile.sleep(8 / self._profile.groq_tokens_per_s)
+            delta = SimpleNamespace(content="".join(tokens[i:i + 8]))
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)], usage=None, x_groq=None)
+        yield SimpleNamespace(choices=[], usage=None, x_groq=SimpleNamespace(usage=usage))
+
+
+def install(profile: ProviderProfile = None) -> ProviderProfile:
+    """
+    Routes every Yahoo, DuckDuckGo and Groq call in this process to the fakes.
+    """
+    profile = profile or ProviderProfile()
+    sys.modules["yfinance"] = fake_yfinance(profile)
+    sys.modules["duckduckgo_search"] = fake_duckduckgo_search(profile)
+
+    import src.llm as llm
+    llm._client = FakeGroq(profile)
+    return profile
@@ -0,0 +1,88 @@
+# scripts/import_budget.py
+"""
+Import-time budget check for the entry points.
+
+Imports each entry module in a fresh interpreter with `python -X importtime`,
+prints the slowest modules it pulled in, and fails if the total exceeds the
+budget or if a heavy dependency that should be deferred was loaded eagerly.
+
+Usage:
+    python scripts/import_budget.py                  # default entry points
+    python scripts/import_budget.py src.graph --top 20 --budget-ms 500
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ENTRY_POINTS = ["src.graph", "app"]
+
+# Loaded on first use by the stage that needs them, never at import time
+DEFERRED = ["mplfinance", "matplotlib", "yfinance", "duckduckgo_search", "groq", "fpdf", "tkinter"]
+
+DEFAULT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "800"))
+
+
+def measure(module: str) -> list:
+    """
+    Returns [(name, self_us, cumulative_us, depth)] for one cold import of module.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr.strip().splitlines()[-1]}")
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def report(module: str, top: int, budget_ms: float) -> bool:
+    rows = measure(module)
+    total_ms = next(c for name, _, c, _ in reversed(rows) if name == module) / 1000
+    loaded = {name for name, _, _, _ in rows}
+
+    print(f"\n=== {module}: {total_ms:.0f} ms (budget {budget_ms:.0f} ms) ===")
+    # Top-level packages by cumulative cost: the place to start deferring
+    packages = {}
+    for name, _, cumulative, _ in rows:
+        root = name.split(".")[0]
+        if root in ("src", module.split(".")[0]):
+            continue  # our own code: its cost is the sum of the packages below
+        packages[root] = max(packages.get(root, 0), cumulative)
+    for name, cumulative in sorted(packages.items(), key=lambda kv: -kv[1])[:top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    eager = [dep for dep in DEFERRED if dep in loaded]
+    ok = total_ms <= budget_ms and not eager
+    if eager:
+        print(f"❌ Loaded eagerly (should be deferred): {', '.join(eager)}")
+    if total_ms > budget_ms:
+        print(f"❌ Over budget by {total_ms - budget_ms:.0f} ms")
+    if ok:
+        print("✅ Within budget")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("modules", nargs="*", default=ENTRY_POINTS)
+    parser.add_argument("--top", type=int, default=10, help="packages to list per module")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    args = parser.parse_args()
+
+    results = [report(m, args.top, args.budget_ms) for m in args.modules]
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# src/cache.py
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+CACHE_PATH = os.getenv("CACHE_PATH", os.path.join(".cache", "cache.sqlite"))
+
+
+def make_key(*parts) -> str:
+    """
+    Content-addressed cache key: SHA-256 of the JSON-encoded parts.
+    """
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class TieredCache:
+    """
+    Two-tier TTL cache for JSON-serializable values.
+
+    Tier 1 is an in-process LRU (max_entries items). Tier 2 is a table in a
+    SQLite file shared by every process on the machine, so separate sessions
+    and workers reuse each other's results. Entries expire after ttl seconds;
+    a ttl of 0 disables the cache.
+    """
+
+    def __init__(self, name: str, ttl: float, max_entries: int = 256, path: str = CACHE_PATH):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.path = path
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_ready = False
+
+    @contextmanager
+    def _connect(self):
+        if not self._disk_ready:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                if not self._disk_ready:
+                    conn.execute(
+                        f"CREATE TABLE IF NOT EXISTS {self.name} ("
+                        "key TEXT PRIMARY KEY, value TEXT, expires_at REAL)"
+                    )
+                    self._disk_ready = True
+                yield conn
+        finally:
+            conn.close()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def get(self, key: str):
+        """
+        Returns the cached value, or None on a miss or expired entry.
+        """
+        if not self.enabled:
+            return None
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry and entry[0] > now:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return entry[1]
+
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    f"SELECT value, expires_at FROM {self.name} WHERE key = ? AND expires_at > ?",
+                    (key, now),
+                ).fetchone()
+        except sqlite3.Error as e:
+            print(f"[WARNING] Cache read error ({self.name}): {e}")
+            row = None
+
+        with self._lock:
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+            self.stats["disk_hits"] += 1
+            value = json.loads(row[0])
+            self._remember(key, value, row[1])
+            return value
+
+    def set(self, key: str, value):
+        if not self.enabled:
+            return
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._remember(key, value, expires_at)
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    f"INSERT OR REPLACE INTO {self.name} (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(value), expires_at),
+                )
+                conn.execute(f"DELETE FROM {self.name} WHERE expires_at <= ?", (time.time(),))
+        except sqlite3.Error as e:
+            print(f"[WARNING] Cache write error ({self.name}): {e}")
+
+    def _remember(self, key: str, value, expires_at: float):
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
@@ -0,0 +1,214 @@
+# src/dag.py
+"""
+Minimal DAG executor for the agent pipeline.
+
+Nodes declare the state keys they read (inputs) and write (outputs):
+
+    graph = Graph([
+        Node("researcher", researcher, inputs=["ticker"], outputs=["news_summary"], timeout=30, retries=1),
+        Node("analyst", analyst, inputs=["ticker"], outputs=["metrics"]),
+        Node("writer", writer, inputs=["news_summary", "metrics"], outputs=["final_report"]),
+    ])
+    for update in graph.stream({"ticker": "AAPL"}):   # {"researcher": {...}} as each node finishes
+        ...
+
+A node starts as soon as all its inputs are available, so independent nodes
+run in parallel, each on its own thread. A node function takes its inputs as
+keyword arguments and returns a dict with its outputs. If it is a generator,
+every value it yields is streamed as a partial update and its return value
+holds the outputs.
+"""
+import contextvars
+import inspect
+import queue
+import threading
+import time
+
+
+class NodeTimeout(TimeoutError):
+    pass
+
+
+class Node:
+    """
+    One step of a Graph.
+
+    timeout: seconds per attempt (None for no limit). A timed-out attempt is
+        abandoned (Python threads cannot be killed) and its late results ignored.
+    retries: extra attempts after a raised error, backoff * 2**n seconds apart.
+        A timeout is not retried: the abandoned attempt still holds whatever
+        it locked (per-query locks, service semaphores), so a new attempt
+        would only queue behind it and time out again.
+    fallback: optional fn(error, **inputs) -> outputs, used once every attempt
+        failed. Without one, the error is raised from Graph.stream.
+    """
+
+    def __init__(self, name: str, fn, inputs: list, outputs: list, timeout: float = None,
+                 retries: int = 0, backoff: float = 1.0, fallback=None):
+        self.name = name
+        self.fn = fn
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.fallback = fallback
+
+
+class Graph:
+    """
+    A set of nodes wired together by the state keys they read and write.
+    """
+
+    def __init__(self, nodes: list):
+        self.nodes = {}
+        producers = {}
+        for node in nodes:
+            if node.name in self.nodes:
+                raise ValueError(f"Duplicate node name: {node.name}")
+            self.nodes[node.name] = node
+            for key in node.outputs:
+                if key in producers:
+                    raise ValueError(f"Output '{key}' is produced by both {producers[key]} and {node.name}")
+                producers[key] = node.name
+        self.producers = producers
+        # Keys no node produces must be supplied in the initial state
+        self.state_inputs = sorted({k for n in nodes for k in n.inputs if k not in producers})
+        self.order = self._topological_order()
+
+    def _topological_order(self) -> list:
+        deps = {
+            name: {self.producers[k] for k in node.inputs if k in self.producers}
+            for name, node in self.nodes.items()
+        }
+        order = []
+        while deps:
+            ready = [name for name, d in deps.items() if not d]
+            if not ready:
+                raise ValueError(f"Cycle between nodes: {', '.join(sorted(deps))}")
+            for name in ready:
+                del deps[name]
+                order.append(name)
+            for d in deps.values():
+                d.difference_update(ready)
+        return order
+
+    def stream(self, state: dict):
+        """
+        Runs the graph on state (which must hold every key in state_inputs).
+        Yields {node_name: update} for each partial update and, once a node
+        finishes, {node_name: outputs}. Raises the error of a node that
+        failed on every attempt and has no fallback.
+        """
+        missing = [k for k in self.state_inputs if k not in state]
+        if missing:
+            raise ValueError(f"Missing graph inputs: {', '.join(missing)}")
+
+        values = dict(state)
+        events = queue.Queue()
+        pending = list(self.order)
+        attempts = {name: 0 for name in self.nodes}
+        running = {}  # name -> [current attempt, deadline]
+        # Attempts run in copies of the caller's context (e.g. its telemetry trace)
+        context = contextvars.copy_context()
+
+        def start(node: Node, delay: float = 0.0):
+            attempts[node.name] += 1
+            running[node.name] = [attempts[node.name], None]
+            kwargs = {k: values[k] for k in node.inputs}
+            threading.Thread(
+                target=context.copy().run, args=(self._attempt, node, attempts[node.name], kwargs, delay, events),
+                name=f"dag-{node.name}", daemon=True,
+            ).start()
+
+        def failed(node: Node, error: Exception, retry: bool = True):
+            """
+            Schedules a retry, or returns the fallback outputs (None to retry).
+            """
+            if retry and attempts[node.name] <= node.retries:
+                delay = node.backoff * 2 ** (attempts[node.name] - 1)
+                print(f"[DAG] {node.name} failed ({error}), retry {attempts[node.name]}/{node.retries} in {delay:g}s")
+                start(node, delay)
+                return None
+            del running[node.name]
+            if node.fallback is None:
+                raise error
+            print(f"[DAG] {node.name} failed ({error}), using fallback")
+            return self._check_outputs(node, node.fallback(error, **{k: values[k] for k in node.inputs}))
+
+        while pending or running:
+            for name in [n for n in pending if all(k in values for k in self.nodes[n].inputs)]:
+                pending.remove(name)
+                start(self.nodes[name])
+
+            deadlines = [d for _, d in running.values() if d is not None]
+            try:
+                wait = max(min(deadlines) - time.monotonic(), 0) if deadlines else None
+                kind, name, attempt, payload = events.get(timeout=wait)
+            except queue.Empty:
+                now = time.monotonic()
+                expired = [n for n, (_, d) in running.items() if d is not None and d <= now]
+                for name in expired:
+                    node = self.nodes[name]
+                    outputs = failed(node, NodeTimeout(f"{name} timed out after {node.timeout:g}s"), retry=False)
+                    if outputs is not None:
+                        values.update(outputs)
+                        yield {name: outputs}
+                continue
+
+            if name not in running or running[name][0] != attempt:
+                continue  # Late event from an abandoned attempt
+            node = self.nodes[name]
+            if kind == "start":
+                if node.timeout:
+                    running[name][1] = time.monotonic() + node.timeout
+            elif kind == "partial":
+                yield {name: payload}
+            elif kind == "done":
+                del running[name]
+                outputs = self._check_outputs(node, payload)
+                values.update(outputs)
+                yield {name: outputs}
+            else:
+                outputs = failed(node, payload)
+                if outputs is not None:
+                    values.update(outputs)
+                    yield {name: outputs}
+
+    def invoke(self, state: dict) -> dict:
+        """
+        Runs the graph to completion and returns the final state.
+        """
+        values = dict(state)
+        for update in self.stream(state):
+            for name, output in update.items():
+                # Partial updates carry no declared outputs
+                values.update({k: output[k] for k in self.nodes[name].outputs if k in output})
+        return values
+
+    @staticmethod
+    def _attempt(node: Node, attempt: int, kwargs: dict, delay: float, events: queue.Queue):
+        if delay:
+            time.sleep(delay)
+        events.put(("start", node.name, attempt, None))
+        try:
+            result = node.fn(**kwargs)
+            if inspect.isgenerator(result):
+                while True:
+                    try:
+                        events.put(("partial", node.name, attempt, next(result)))
+                    except StopIteration as stop:
+                        result = stop.value
+                        break
+            events.put(("done", node.name, attempt, result))
+        except Exception as e:
+            events.put(("error", node.name, attempt, e))
+
+    @staticmethod
+    def _check_outputs(node: Node, outputs) -> dict:
+        if not isinstance(outputs, dict):
+            raise TypeError(f"Node {node.name} returned {type(outputs).__name__}, expected a dict of outputs")
+        missing = [k for k in node.outputs if k not in outputs]
+        if missing:
+            raise ValueError(f"Node {node.name} did not produce: {', '.join(missing)}")
+        return outputs
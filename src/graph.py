@@ -1,14 +1,33 @@
 # src/graph.py
+import asyncio
+import contextlib
+import contextvars
 import os
-import mplfinance as mpf
-import matplotlib
-matplotlib.use('Agg') 
-import matplotlib.pyplot as plt
-import yfinance as yf
-from duckduckgo_search import DDGS
-
-from src.llm import generate_report
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from src.dag import Graph, Node
+from src.prompt import news_summary as compact_news
+from src.refresh import (
+    run_store, run_key, text_fingerprint, frame_fingerprint, encode_analyst, decode_analyst, writer_policy,
+)
+from src.telemetry import span, trace
+from src.llm import generate_report_stream
 from src.tools.financial_tools import get_stock_prices, get_company_info
+from src.tools.charts import render_chart
+from src.tools.indicators import compute_indicators
+from src.tools.market_data import MarketSnapshot, fetch_snapshot, fetch_snapshots
+from src.tools.news_search import search_news
+
+# Default concurrency caps per external service for batch runs
+SERVICE_LIMITS = {
+    "search": int(os.getenv("SEARCH_CONCURRENCY", "2")),   # DuckDuckGo (throttled by IP)
+    "yahoo": int(os.getenv("YAHOO_CONCURRENCY", "4")),     # yfinance profile lookups
+    "llm": int(os.getenv("LLM_CONCURRENCY", "2")),         # Groq completions
+}
+# Share one run between concurrent requests for the same ticker (see coalesced_updates)
+SINGLE_FLIGHT = os.getenv("SINGLE_FLIGHT", "1") != "0"
 
 def researcher_node(ticker: str) -> str:
     """
@@ -18,119 +37,513 @@ def researcher_node(ticker: str) -> str:
     print(f"[RESEARCHER] Searching news for {ticker}...")
     search_query = f"{ticker} stock latest news financial analysis"
     
-    try:
-        # Use DuckDuckGo search directly
-        with DDGS() as ddgs:
-            results = list(ddgs.text(search_query, max_results=5))
-            news_summary = "\n".join([f"- {r['title']}: {r['body']}" for r in results])
-        return news_summary
-    except Exception as e:
-        print(f"[WARNING] Search error: {e}")
-        return f"Unable to fetch news for {ticker}"
+    with span("researcher", ticker=ticker) as s:
+        try:
+            # DuckDuckGo search (cached and de-duplicated)
+            results = search_news(search_query, max_results=5)
+            news_summary = compact_news(results)
+            return news_summary
+        except Exception as e:
+            print(f"[WARNING] Search error: {e}")
+            s["error"] = str(e)
+            return f"Unable to fetch news for {ticker}"
 
-def analyst_node(ticker: str) -> dict:
+def analyst_node(ticker: str, snapshot: MarketSnapshot = None) -> dict:
     """
     Generates technical analysis chart and calculates key metrics.
-    Returns dict with chart_path, metrics, and financial_data.
+    Uses the run's shared market snapshot (fetched here if not provided).
+    Returns dict with chart_png (PNG bytes, rendered in memory), metrics,
+    and financial_data.
     """
     print(f"[ANALYST] Generating Technical Candlestick Chart for {ticker}...")
     
-    prices_text = get_stock_prices(ticker)
-    info = get_company_info(ticker)
+    with span("analyst", ticker=ticker):
+        snapshot = snapshot or fetch_snapshot(ticker)
+        prices_text = get_stock_prices(ticker, snapshot)
+        info = get_company_info(ticker, snapshot)
     
-    chart_filename = f"{ticker}_chart.png"
-    metrics = {}
+        chart_png = b""
+        metrics = {}
     
-    try:
-        data = yf.Ticker(ticker).history(period="1mo")
-        if not data.empty:
-            # --- 1. CALCULATE METRICS FOR UI ---
-            current_price = data['Close'].iloc[-1]
-            prev_price = data['Close'].iloc[-2]
-            change = current_price - prev_price
-            pct_change = (change / prev_price) * 100
-            volume = data['Volume'].iloc[-1]
-            
-            # Simple Technical Signal (Price vs 20-SMA)
-            sma_20 = data['Close'].rolling(window=20).mean().iloc[-1]
-            signal = "BULLISH" if current_price > sma_20 else "BEARISH"
+        try:
+            # Work on a copy: the snapshot is shared with the other consumers
+            data = snapshot.history.copy()
+            if not data.empty:
+                # --- 1. CALCULATE METRICS FOR UI ---
+                current_price = data['Close'].iloc[-1]
+                prev_price = data['Close'].iloc[-2]
+                change = current_price - prev_price
+                pct_change = (change / prev_price) * 100
+                volume = data['Volume'].iloc[-1]
+                indicators = snapshot.indicators
             
-            metrics = {
-                "current_price": f"${current_price:.2f}",
-                "change": f"{change:.2f}",
-                "pct_change": f"{pct_change:.2f}%",
-                "volume": f"{volume:,}",
-                "signal": signal
-            }
+                # Simple Technical Signal (Price vs 20-SMA)
+                sma_20 = indicators.get("sma_20", float("nan"))
+                signal = "BULLISH" if current_price > sma_20 else "BEARISH"
             
-            # --- 2. GENERATE CHART ---
-            # Clean index for mplfinance
-            data.index = data.index.tz_localize(None)
-            data = data[['Open', 'High', 'Low', 'Close', 'Volume']]
+                metrics = {
+                    "current_price": f"${current_price:.2f}",
+                    "change": f"{change:.2f}",
+                    "pct_change": f"{pct_change:.2f}%",
+                    "volume": f"{volume:,}",
+                    "signal": signal
+                }
+                # Technical indicators (NaN when the window is too short)
+                metrics.update({
+                    name: "N/A" if value != value else f"{value:.2f}"
+                    for name, value in indicators.items()
+                })
             
-            mpf.plot(
-                data, 
-                type='candle', 
-                style='charles',
-                title=f"\n{ticker} - Technical Analysis",
-                volume=True,
-                mav=(20), 
-                savefig=chart_filename,
-                figsize=(12, 8)
-            )
-            print(f"[SUCCESS] Technical Chart generated: {chart_filename}")
-        else:
-            chart_filename = ""
-    except Exception as e:
-        print(f"[WARNING] Chart Error: {e}")
-        chart_filename = ""
+                # --- 2. GENERATE CHART (memoized on the OHLCV content) ---
+                chart_png = render_chart(ticker, data)
+                print(f"[SUCCESS] Technical Chart generated ({len(chart_png) // 1024} KB)")
+        except Exception as e:
+            print(f"[WARNING] Chart Error: {e}")
+            chart_png = b""
 
-    return {
-        "financial_data": f"--- INFO ---\n{info}\n\n--- PRICES ---\n{prices_text}",
-        "chart_path": chart_filename,
-        "metrics": metrics
-    }
+        return {
+            "financial_data": f"--- INFO ---\n{info}\n\n--- PRICES ---\n{prices_text}",
+            "chart_png": chart_png,
+            "metrics": metrics
+        }
 
-def writer_node(ticker: str, news: str, data: str) -> str:
+def stream_writer_node(ticker: str, news: str, data: str):
     """
     Compiles the final investment report using the LLM.
-    Returns the report text.
+    Yields the partial report text (accumulated so far) as tokens arrive.
+    """
+    print(f"[WRITER] Streaming final report for {ticker}...")
+    
+    report = ""
+    with span("writer", ticker=ticker, stream=True):
+        for delta in generate_report_stream(ticker, data, news):
+            report += delta
+            yield report
+
+def _limited(limits: dict, service: str, fn, *args):
+    """
+    Calls fn(*args) while holding the service's semaphore (if limits are set).
+    """
+    if not limits:
+        return fn(*args)
+    with limits[service]:
+        return fn(*args)
+
+def analyst_inputs(ticker: str, snapshot: MarketSnapshot) -> dict:
+    """
+    Fingerprints of the Analyst's inputs: the OHLCV frame and the company
+    profile (as sent to the Writer).
+    """
+    try:
+        prices = frame_fingerprint(snapshot.history)
+    except Exception:
+        prices = "unavailable"
+    return {"prices": prices, "profile": text_fingerprint(get_company_info(ticker, snapshot))}
+
+def incremental_analyst_node(ticker: str, snapshot: MarketSnapshot, previous: dict = None) -> dict:
+    """
+    analyst_node, skipped when the prices and company profile are unchanged
+    since the previous run: its chart, metrics and data are reused.
+    """
+    if previous and previous.get("analyst"):
+        inputs = analyst_inputs(ticker, snapshot)
+        if all(inputs[name] == previous["inputs"][name] for name in inputs):
+            print(f"[ANALYST] Prices and profile unchanged for {ticker}, reusing chart and metrics")
+            with span("analyst", ticker=ticker, reused=True):
+                return decode_analyst(previous["analyst"])
+    return analyst_node(ticker, snapshot)
+
+def _last_close(snapshot: MarketSnapshot):
+    try:
+        return float(snapshot.history['Close'].iloc[-1])
+    except Exception:
+        return None
+
+# --- PIPELINE GRAPH ---
+# Each agent is a node that declares the state keys it reads and writes; the
+# executor (src/dag.py) starts a node as soon as its inputs exist, so the
+# Researcher and Analyst run in parallel and the Writer waits for both.
+# A new agent only lengthens the critical path if the Writer reads its output.
+
+def _research(ticker: str, limits: dict) -> dict:
+    return {"news_summary": _limited(limits, "search", researcher_node, ticker)}
+
+def _no_news(error: Exception, ticker: str, limits: dict) -> dict:
+    return {"news_summary": f"Unable to fetch news for {ticker}"}
+
+def _analyze(ticker: str, snapshot: MarketSnapshot, previous: dict, limits: dict) -> dict:
+    return _limited(limits, "yahoo", incremental_analyst_node, ticker, snapshot, previous)
+
+def _write(ticker: str, news_summary: str, financial_data: str, metrics: dict, chart_png: bytes,
+           snapshot: MarketSnapshot, previous: dict, refresh_key: str, limits: dict):
+    """
+    Writer node: serves the previous report unless writer_policy finds a
+    material change, otherwise streams a new one (yields partial_report
+    updates). Records the run for the next incremental refresh.
+    """
+    inputs = {"news": text_fingerprint(news_summary), **analyst_inputs(ticker, snapshot)}
+    close, signal = _last_close(snapshot), metrics.get("signal")
+    reason = writer_policy(previous.get("report"), inputs, close, signal)
+    if reason is None:
+        report = previous["report"]
+        print(f"[WRITER] No material change for {ticker}, reusing report from "
+              f"{time.strftime('%H:%M', time.localtime(report['created_at']))}")
+        with span("writer", ticker=ticker, reused=True):
+            final_report = report["text"]
+    else:
+        if previous.get("report"):
+            print(f"[WRITER] Rewriting report for {ticker}: {reason}")
+        # Always streamed; callers that want only the result skip the partials
+        final_report = ""
+        with limits["llm"] if limits else contextlib.nullcontext():
+            for final_report in stream_writer_node(ticker, news_summary, financial_data):
+                yield {"partial_report": final_report}
+        report = {"text": final_report, "inputs": inputs, "close": close, "signal": signal, "created_at": time.time()}
+    
+    if final_report:
+        analyst = {"financial_data": financial_data, "chart_png": chart_png, "metrics": metrics}
+        run_store.set(refresh_key, {"inputs": inputs, "analyst": encode_analyst(analyst), "report": report})
+    return {"final_report": final_report}
+
+def _timeout(name: str, default: str):
+    # Seconds per attempt; 0 disables
+    return float(os.getenv(name, default)) or None
+
+REPORT_GRAPH = Graph([
+    Node("researcher", _research, inputs=["ticker", "limits"], outputs=["news_summary"],
+         timeout=_timeout("RESEARCHER_TIMEOUT", "45"), retries=1, fallback=_no_news),
+    Node("analyst", _analyze, inputs=["ticker", "snapshot", "previous", "limits"],
+         outputs=["financial_data", "chart_png", "metrics"],
+         timeout=_timeout("ANALYST_TIMEOUT", "60"), retries=1),
+    # No default timeout: the attempt includes queueing for a Groq slot and the whole stream
+    Node("writer", _write,
+         inputs=["ticker", "news_summary", "financial_data", "metrics", "chart_png",
+                 "snapshot", "previous", "refresh_key", "limits"],
+         outputs=["final_report"], timeout=_timeout("WRITER_TIMEOUT", "0")),
+])
+
+def _pipeline_updates(ticker: str, snapshot: MarketSnapshot, limits: dict = None):
+    """
+    One run of REPORT_GRAPH as a stream of node updates: Researcher and
+    Analyst in completion order, the Writer's partial text as tokens
+    arrive, then the final report with the run's timing spans.
+    
+    Incremental: stages whose inputs are unchanged since the ticker's last
+    run reuse its outputs, and the previous report is served unless
+    writer_policy finds a material change (see src/refresh.py).
+    """
+    with trace(ticker) as run_trace:
+        key = run_key(ticker, snapshot.period, snapshot.interval)
+        state = {
+            "ticker": ticker, "snapshot": snapshot, "limits": limits,
+            "previous": run_store.get(key) or {}, "refresh_key": key,
+        }
+        for update in REPORT_GRAPH.stream(state):
+            if "final_report" in update.get("writer", {}):
+                final_report = update["writer"]["final_report"]
+            else:
+                yield update
+    yield {"writer": {"final_report": final_report, "telemetry": run_trace.spans}}
+
+# --- SINGLE-FLIGHT ---
+# Concurrent requests for the same ticker and history window share one run:
+# the first caller starts it, later callers replay the updates published so
+# far and then follow it live. One search, one fetch, one chart, one Groq
+# call per burst instead of one per session.
+
+class _Flight:
+    """
+    An in-flight pipeline run whose updates are shared by all its subscribers.
+    
+    Node completions are all kept, for late joiners to replay. Partial
+    Writer updates carry the whole text so far, so only the latest one is
+    kept (with its position among the completions): subscribers that fall
+    behind skip straight to it.
+    """
+
+    def __init__(self, key: tuple):
+        self.key = key
+        self.updates = []
+        self.partial = None  # (len(updates) when published, update)
+        self.version = 0  # Bumped on every publish
+        self.subscribers = 0
+        self.done = False
+        self.error = None
+        self._cond = threading.Condition()
+        self._wakers = []  # async subscribers (see afollow)
+
+    def _notify(self):
+        # Called with _cond held
+        self._cond.notify_all()
+        for wake in self._wakers:
+            wake()
+
+    def publish(self, update: dict):
+        with self._cond:
+            if any("partial_report" in output for output in update.values()):
+                self.partial = (len(self.updates), update)
+            else:
+                self.updates.append(update)
+            self.version += 1
+            self._notify()
+
+    def finish(self, error: Exception = None):
+        with self._cond:
+            self.done = True
+            self.error = error
+            self._notify()
+
+    def _take(self, cursor: tuple):
+        """
+        Updates published after cursor (completions seen, last partial seen)
+        and the new cursor. Called with _cond held.
+        """
+        index, seen = cursor
+        batch = []
+        if self.partial is not None:
+            position, partial = self.partial
+            # Older than a completion already returned: superseded
+            if partial is not seen and position >= index:
+                batch += self.updates[index:position] + [partial]
+                index, seen = position, partial
+        batch += self.updates[index:]
+        return batch, (len(self.updates), seen)
+
+    def follow(self):
+        """
+        Yields every update of the run from the start, blocking for new
+        ones until it finishes. Re-raises the run's error, if any.
+        """
+        cursor, version = (0, None), 0
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self.version != version or self.done)
+                version = self.version
+                batch, cursor = self._take(cursor)
+                done, error = self.done, self.error
+            yield from batch
+            if done:
+                if error is not None:
+                    raise error
+                return
+
+    async def afollow(self):
+        """
+        Async version of follow. Waiting for an update holds no thread: the
+        run's thread wakes the event loop through call_soon_threadsafe.
+        """
+        loop = asyncio.get_running_loop()
+        ready = asyncio.Event()
+
+        def wake():
+            with contextlib.suppress(RuntimeError):  # The loop is already closed
+                loop.call_soon_threadsafe(ready.set)
+
+        with self._cond:
+            self._wakers.append(wake)
+        try:
+            cursor = (0, None)
+            while True:
+                with self._cond:
+                    # Cleared under the lock: a publish after this sets it again
+                    ready.clear()
+                    batch, cursor = self._take(cursor)
+                    done, error = self.done, self.error
+                for update in batch:
+                    yield update
+                if done:
+                    if error is not None:
+                        raise error
+                    return
+                await ready.wait()
+        finally:
+            with self._cond:
+                self._wakers.remove(wake)
+
+_flights = {}
+_flights_lock = threading.Lock()
+
+def _fly(flight: _Flight, ticker: str, snapshot: MarketSnapshot, limits: dict):
+    error = None
+    try:
+        for update in _pipeline_updates(ticker, snapshot, limits):
+            flight.publish(update)
+    except Exception as e:
+        print(f"[WARNING] Analysis failed for {ticker}: {e}")
+        error = e
+    finally:
+        # Unregister first: requests arriving from now on start a fresh run
+        with _flights_lock:
+            if _flights.get(flight.key) is flight:
+                del _flights[flight.key]
+        flight.finish(error)
+
+def coalesced_updates(ticker: str, snapshot: MarketSnapshot = None, limits: dict = None,
+                      period: str = None, interval: str = None):
     """
-    print(f"[WRITER] Compiling final report for {ticker}...")
+    Node updates (as _pipeline_updates) of the run for ticker and history
+    window, joining the identical run already in flight if there is one.
     
-    report = generate_report(ticker, data, news)
-    return report
+    The run executes on its own thread, so it completes (and fills the
+    caches) even if every subscriber stops reading. Set SINGLE_FLIGHT=0
+    to give every caller its own run.
+    """
+    # Lazy snapshot: the Analyst thread fetches it, in parallel with the search
+    snapshot = snapshot or MarketSnapshot(ticker, period, interval=interval)
+    if not SINGLE_FLIGHT:
+        return _pipeline_updates(ticker, snapshot, limits)
+    return _join_flight(ticker, snapshot, limits).follow()
 
-def run_analysis(ticker: str) -> dict:
+def _join_flight(ticker: str, snapshot: MarketSnapshot, limits: dict = None, shared: bool = True) -> _Flight:
+    """
+    The in-flight run for ticker and snapshot's history window, started
+    if there is none. With shared=False, always a new run of its own.
+    """
+    key = (ticker.upper(), snapshot.period, snapshot.interval)
+    with _flights_lock:
+        flight = _flights.get(key) if shared else None
+        leader = flight is None
+        if leader:
+            flight = _Flight(key)
+            if shared:
+                _flights[key] = flight
+        flight.subscribers += 1
+    
+    if leader:
+        # Copy of the caller's context: the run joins the caller's trace, if any
+        threading.Thread(
+            target=contextvars.copy_context().run, args=(_fly, flight, ticker, snapshot, limits),
+            name=f"flight-{ticker}", daemon=True,
+        ).start()
+    else:
+        print(f"[GRAPH] Joining in-flight analysis for {ticker} ({flight.subscribers} subscribers)")
+    return flight
+
+def run_analysis(ticker: str, snapshot: MarketSnapshot = None, limits: dict = None,
+                 period: str = None, interval: str = None) -> dict:
     """
     Main orchestration function that runs the complete analysis pipeline.
+    Concurrent calls for the same ticker and history window share one run
+    (see coalesced_updates).
     
     Args:
         ticker: Stock ticker symbol (e.g., 'AAPL', 'NVDA')
+        snapshot: Optional market snapshot already fetched for this run
+            (e.g., during validation). Fetched once here otherwise.
+        limits: Optional dict of service name -> semaphore, used by
+            run_analysis_many to cap concurrent calls per external service.
+        period, interval: History window and bar size (e.g. '5y', '1wk').
+            Default to HISTORY_PERIOD / HISTORY_INTERVAL ('1mo' / '1d').
     
     Returns:
-        dict with keys: ticker, final_report, chart_path, metrics
+        dict with keys: ticker, final_report, chart_png, metrics, telemetry
+        (the run's timing spans, see src/telemetry.py)
     """
-    # Step 1: Research
-    news_summary = researcher_node(ticker)
+    state = {}
+    for update in coalesced_updates(ticker, snapshot, limits, period, interval):
+        for output in update.values():
+            if "partial_report" not in output:
+                state.update(output)
     
-    # Step 2: Analysis
-    analyst_result = analyst_node(ticker)
+    return {
+        "ticker": ticker,
+        "final_report": state["final_report"],
+        "chart_png": state["chart_png"],
+        "metrics": state["metrics"],
+        "telemetry": state["telemetry"]
+    }
+
+def run_analysis_many(tickers: list, max_workers: int = 8, service_limits: dict = None,
+                      period: str = None, interval: str = None):
+    """
+    Runs the pipeline for a whole watchlist.
     
-    # Step 3: Writing
-    final_report = writer_node(
-        ticker, 
-        news_summary, 
-        analyst_result["financial_data"]
-    )
+    Prices for every ticker are fetched in one bulk download, then the
+    per-ticker pipelines run on a pool of max_workers threads. Calls to each
+    external service are additionally capped by SERVICE_LIMITS (override
+    per service with service_limits, e.g. {"llm": 1}). period and interval
+    select the history window as in run_analysis.
+    
+    Yields one result dict per ticker (same keys as run_analysis) as soon as
+    it finishes. Failed tickers yield {"ticker": ..., "error": ...} instead
+    of aborting the batch.
+    """
+    tickers = list(dict.fromkeys(t.upper().strip() for t in tickers if t.strip()))
+    limits = {
+        service: threading.Semaphore(n)
+        for service, n in {**SERVICE_LIMITS, **(service_limits or {})}.items()
+    }
+    snapshots = fetch_snapshots(tickers, period, interval)
+    
+    # Indicators for the whole watchlist in one vectorized pass
+    valid = {t: s.history for t, s in snapshots.items() if s.is_valid}
+    for ticker, values in compute_indicators(valid).items():
+        snapshots[ticker].indicators = values
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {}
+        for ticker in tickers:
+            if not snapshots[ticker].is_valid:
+                yield {"ticker": ticker, "error": f"No market data found for {ticker}"}
+                continue
+            futures[pool.submit(run_analysis, ticker, snapshots[ticker], limits)] = ticker
+        
+        for future in as_completed(futures):
+            ticker = futures[future]
+            try:
+                yield future.result()
+            except Exception as e:
+                print(f"[WARNING] Analysis failed for {ticker}: {e}")
+                yield {"ticker": ticker, "error": str(e)}
+
+# --- ASYNC PIPELINE ---
+# The async API follows the same graph runs as the sync one (timeouts,
+# retries, single-flight, incremental refresh). The run executes on its own
+# threads; the event loop only awaits its updates, so no executor thread is
+# held while a report is being generated.
+
+async def astream_analysis(ticker: str, snapshot: MarketSnapshot = None, stream_tokens: bool = False,
+                           period: str = None, interval: str = None):
+    """
+    Async generator with the same node updates as LegacyAppAdapter.stream.
+    With stream_tokens, partial Writer output is yielded as it is generated.
+    The final Writer update carries the run's timing spans under "telemetry".
+    Joins an identical run already in flight (see coalesced_updates).
+    """
+    snapshot = snapshot or MarketSnapshot(ticker, period, interval=interval)
+    # With SINGLE_FLIGHT=0 the flight is private: it only feeds this caller
+    flight = _join_flight(ticker, snapshot, shared=SINGLE_FLIGHT)
+    async for update in flight.afollow():
+        if stream_tokens or "partial_report" not in update.get("writer", {}):
+            yield update
+
+async def arun_analysis(ticker: str, snapshot: MarketSnapshot = None,
+                        period: str = None, interval: str = None) -> dict:
+    """
+    Async version of run_analysis. Returns the same dict.
+    """
+    state = {}
+    async for update in astream_analysis(ticker, snapshot, period=period, interval=interval):
+        for output in update.values():
+            state.update(output)
     
     return {
         "ticker": ticker,
-        "final_report": final_report,
-        "chart_path": analyst_result["chart_path"],
-        "metrics": analyst_result["metrics"]
+        "final_report": state["final_report"],
+        "chart_png": state["chart_png"],
+        "metrics": state["metrics"],
+        "telemetry": state["telemetry"]
     }
 
+def _state_snapshot(state: dict) -> MarketSnapshot:
+    """
+    The snapshot passed in the state, or a lazy one for the state's
+    ticker / period / interval (fetched by the Analyst on first use).
+    """
+    return state.get("snapshot") or MarketSnapshot(
+        state.get("ticker"), state.get("period"), interval=state.get("interval")
+    )
+
 # Legacy compatibility: create an 'app' object that mimics the old LangGraph interface
 class LegacyAppAdapter:
     """Adapter to maintain compatibility with existing code that uses app.stream() or app.invoke()"""
@@ -138,23 +551,28 @@ class LegacyAppAdapter:
     def invoke(self, state: dict) -> dict:
         """Mimics LangGraph's invoke method"""
         ticker = state.get("ticker")
-        result = run_analysis(ticker)
+        result = run_analysis(ticker, _state_snapshot(state))
         return result
     
-    def stream(self, state: dict, stream_mode: str = "updates"):
-        """Mimics LangGraph's stream method by yielding node updates"""
-        ticker = state.get("ticker")
-        
-        # Yield researcher update
-        news_summary = researcher_node(ticker)
-        yield {"researcher": {"news_summary": news_summary}}
-        
-        # Yield analyst update
-        analyst_result = analyst_node(ticker)
-        yield {"analyst": analyst_result}
-        
-        # Yield writer update
-        final_report = writer_node(ticker, news_summary, analyst_result["financial_data"])
-        yield {"writer": {"final_report": final_report}}
+    def stream(self, state: dict, stream_mode: str = "updates", stream_tokens: bool = False):
+        """
+        Mimics LangGraph's stream method by yielding node updates.
+        With stream_tokens, also yields {"writer": {"partial_report": ...}}
+        updates (text so far) while the report is being generated.
+        The final Writer update carries the run's timing spans under "telemetry".
+        Joins an identical run already in flight (see coalesced_updates).
+        """
+        for update in coalesced_updates(state.get("ticker"), _state_snapshot(state)):
+            if stream_tokens or "partial_report" not in update.get("writer", {}):
+                yield update
+    
+    async def ainvoke(self, state: dict) -> dict:
+        """Mimics LangGraph's ainvoke method"""
+        return await arun_analysis(state.get("ticker"), _state_snapshot(state))
+    
+    async def astream(self, state: dict, stream_mode: str = "updates", stream_tokens: bool = False):
+        """Mimics LangGraph's astream method by yielding node updates"""
+        async for update in astream_analysis(state.get("ticker"), _state_snapshot(state), stream_tokens):
+            yield update
 
 app = LegacyAppAdapter()
\ No newline at end of file
@@ -0,0 +1,276 @@
+# src/jobs.py
+"""
+Background report jobs.
+
+submit() records a job in a local SQLite store and hands it to a pool of
+worker processes, which run the pipeline and write stage-by-stage progress
+(including the Writer's partial text) back to the store. Any process, e.g.
+a Streamlit session started after a browser refresh, can poll the job by id.
+"""
+import json
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+
+JOBS_PATH = os.getenv("JOBS_PATH", os.path.join(".cache", "jobs.sqlite"))
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+# Finished jobs (and their results) are kept this long (seconds)
+JOB_TTL = float(os.getenv("JOB_TTL", "86400"))
+# Minimum interval between partial-report writes from a worker (seconds)
+PROGRESS_INTERVAL = 0.5
+# Times a job is resubmitted after its worker pool broke (a worker died)
+JOB_CRASH_RETRIES = 1
+
+STAGES = ["researcher", "analyst", "writer"]
+ACTIVE = ("queued", "running")
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True  # Exists but owned by another user
+    return True
+
+
+class JobStore:
+    """
+    SQLite table of jobs: status, per-stage state, partial and final report,
+    chart PNG, metrics and telemetry. Safe to share between processes.
+    """
+
+    def __init__(self, path: str = JOBS_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            # WAL: workers write progress while the UI reads
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, ticker TEXT, params TEXT, status TEXT, stages TEXT, "
+                "partial_report TEXT, report TEXT, chart BLOB, metrics TEXT, telemetry TEXT, "
+                "error TEXT, owner_pid INTEGER, created_at REAL, updated_at REAL)"
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def create(self, ticker: str, params: dict) -> str:
+        job_id = uuid.uuid4().hex[:16]
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("DELETE FROM jobs WHERE status NOT IN (?, ?) AND updated_at < ?", (*ACTIVE, now - JOB_TTL))
+            conn.execute(
+                "INSERT INTO jobs (id, ticker, params, status, stages, owner_pid, created_at, updated_at) "
+                "VALUES (?, ?, ?, 'queued', ?, ?, ?, ?)",
+                (job_id, ticker, json.dumps(params), json.dumps({s: "waiting" for s in STAGES}),
+                 os.getpid(), now, now),
+            )
+        return job_id
+
+    def find_active(self, ticker: str, params: dict):
+        """
+        Id of a queued or running job for the same ticker and parameters, if any.
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE ticker = ? AND params = ? AND status IN (?, ?) "
+                "ORDER BY created_at LIMIT 1",
+                (ticker, json.dumps(params), *ACTIVE),
+            ).fetchone()
+        return row[0] if row else None
+
+    def update(self, job_id: str, **fields):
+        """
+        Sets columns; stages (dict) is merged into the stored per-stage state.
+        """
+        with self._connect() as conn:
+            if "stages" in fields:
+                row = conn.execute("SELECT stages FROM jobs WHERE id = ?", (job_id,)).fetchone()
+                fields["stages"] = json.dumps({**json.loads(row[0] if row else "{}"), **fields["stages"]})
+            for name in ("metrics", "telemetry"):
+                if name in fields:
+                    fields[name] = json.dumps(fields[name], default=str)
+            fields["updated_at"] = time.time()
+            columns = ", ".join(f"{name} = ?" for name in fields)
+            conn.execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+
+    def get(self, job_id: str):
+        """
+        The job as a dict (JSON columns decoded), or None if unknown/expired.
+        """
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        for name in ("params", "stages", "metrics", "telemetry"):
+            job[name] = json.loads(job[name]) if job[name] else None
+        return job
+
+    def fail_orphans(self):
+        """
+        Marks active jobs whose submitting process is gone (e.g., server
+        restart) as failed, so pollers stop waiting for them.
+        """
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT id, owner_pid FROM jobs WHERE status IN (?, ?)", ACTIVE
+            ).fetchall()
+            orphans = [job_id for job_id, pid in rows if not _pid_alive(pid)]
+            conn.executemany(
+                "UPDATE jobs SET status = 'error', error = 'Interrupted (server restarted)', updated_at = ? WHERE id = ?",
+                [(time.time(), job_id) for job_id in orphans],
+            )
+
+
+def run_job(job_id: str, ticker: str, params: dict, path: str):
+    """
+    Worker-process entry point: runs the pipeline for one job and records
+    each node update in the store.
+    """
+    from src.graph import app
+
+    store = JobStore(path)
+    store.update(job_id, status="running", stages={"researcher": "running", "analyst": "running"})
+    pending = {"researcher", "analyst"}
+    last_write = 0.0
+    try:
+        state = {"ticker": ticker, **params}
+        for chunk in app.stream(state, stream_tokens=True):
+            for node, output in chunk.items():
+                if node == "analyst":
+                    store.update(
+                        job_id, stages={"analyst": "complete"},
+                        chart=output.get("chart_png") or b"", metrics=output.get("metrics") or {},
+                    )
+                elif node == "researcher":
+                    store.update(job_id, stages={"researcher": "complete"})
+                elif "partial_report" in output:
+                    # Throttled: the UI polls, it does not need every token
+                    if time.monotonic() - last_write >= PROGRESS_INTERVAL:
+                        store.update(job_id, partial_report=output["partial_report"])
+                        last_write = time.monotonic()
+                else:
+                    store.update(
+                        job_id, status="done", stages={"writer": "complete"},
+                        report=output.get("final_report") or "", partial_report=None,
+                        telemetry=output.get("telemetry", []),
+                    )
+
+                if node in pending:
+                    pending.discard(node)
+                    if not pending:
+                        store.update(job_id, stages={"writer": "running"})
+    except Exception as e:
+        print(f"[WARNING] Job {job_id} ({ticker}) failed: {e}")
+        store.update(job_id, status="error", error=str(e))
+
+
+class JobQueue:
+    """
+    Accepts report jobs and runs them on a pool of worker processes.
+    """
+
+    def __init__(self, max_workers: int = JOB_WORKERS, path: str = JOBS_PATH):
+        self.store = JobStore(path)
+        self.store.fail_orphans()
+        self.max_workers = max_workers
+        # Reentrant: a done callback can run inside _start on the submitting thread
+        self._submit_lock = threading.RLock()
+        self._pool = self._new_pool()
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        # spawn: never fork a process that is running server threads
+        return ProcessPoolExecutor(max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def _replace_pool(self, broken: ProcessPoolExecutor):
+        """
+        Swaps in a new worker pool. A pool whose worker died (OOM, kill)
+        refuses every later submit, so it is never reused.
+        """
+        with self._submit_lock:
+            if self._pool is broken:
+                print("[JOBS] Worker pool broken, starting a new one")
+                broken.shutdown(wait=False, cancel_futures=True)
+                self._pool = self._new_pool()
+
+    def submit(self, ticker: str, period: str = None, interval: str = None) -> str:
+        """
+        Queues a report for ticker and returns the job id immediately.
+        If an identical job is already queued or running, returns its id
+        instead, so a burst of requests for one ticker runs the pipeline once.
+        """
+        params = {k: v for k, v in {"period": period, "interval": interval}.items() if v}
+        with self._submit_lock:
+            job_id = self.store.find_active(ticker, params)
+            if job_id:
+                print(f"[JOBS] Attaching to in-flight job {job_id} for {ticker}")
+                return job_id
+            job_id = self.store.create(ticker, params)
+            self._start(job_id, ticker, params)
+        return job_id
+
+    def _start(self, job_id: str, ticker: str, params: dict, crashes: int = 0):
+        with self._submit_lock:
+            pool = self._pool
+            try:
+                future = pool.submit(run_job, job_id, ticker, params, self.store.path)
+            except BrokenProcessPool:
+                self._replace_pool(pool)
+                pool = self._pool
+                future = pool.submit(run_job, job_id, ticker, params, self.store.path)
+        future.add_done_callback(lambda f: self._on_done(job_id, ticker, params, crashes, pool, f))
+
+    def _on_done(self, job_id: str, ticker: str, params: dict, crashes: int, pool, future):
+        e = future.exception()
+        if e is None:
+            return
+        if isinstance(e, BrokenProcessPool) and crashes < JOB_CRASH_RETRIES:
+            # Every job on the pool fails with it, not just the one whose worker
+            # died: run them again on a fresh pool
+            print(f"[JOBS] Resubmitting job {job_id} ({ticker}) after a worker crash")
+            self._replace_pool(pool)
+            self.store.update(job_id, status="queued")
+            self._start(job_id, ticker, params, crashes + 1)
+            return
+        # Worker crashed or was killed before it could record the failure
+        self.store.update(job_id, status="error", error=f"Worker failed: {e}")
+
+    def get(self, job_id: str):
+        return self.store.get(job_id)
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    """
+    Returns the process-wide job queue (worker pool started on first use).
+    """
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = JobQueue()
+        return _queue
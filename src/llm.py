@@ -1,30 +1,113 @@
 # src/llm.py
 import os
+import threading
+import time
 from dotenv import load_dotenv
-from groq import Groq
-from groq import RateLimitError
+
+from src.cache import TieredCache, make_key
+from src.prompt import estimate_tokens
+from src.rate_limit import RateLimiter, backoff_delay, parse_retry_after
+from src.telemetry import span
 
 # 1. Load environment variables (Local development only)
+# Kept eager (~10 ms): the GROQ_* settings below are read at import time.
+# The groq SDK itself is imported on first use, see get_llm_client.
 load_dotenv()
 
-def get_llm_client():
-    """
-    Initializes and returns the Groq API client.
-    """
+MODEL = "llama-3.3-70b-versatile"
+TEMPERATURE = 0  # We want precise data, not creativity
+
+# temperature=0 makes completions deterministic per prompt, so they are
+# memoized on (model, prompt, temperature). LLM_CACHE_TTL=0 disables it.
+report_cache = TieredCache(
+    "llm_responses",
+    ttl=float(os.getenv("LLM_CACHE_TTL", "900")),
+    max_entries=int(os.getenv("LLM_CACHE_SIZE", "128")),
+)
+
+# Groq quota for this process (free tier: 30 requests/min, 12K tokens/min)
+REQUESTS_PER_MINUTE = float(os.getenv("GROQ_RPM_LIMIT", "30"))
+TOKENS_PER_MINUTE = float(os.getenv("GROQ_TPM_LIMIT", "12000"))
+MAX_RETRIES = int(os.getenv("GROQ_MAX_RETRIES", "5"))
+# Completion tokens reserved up front on top of the estimated prompt size
+COMPLETION_TOKENS_ESTIMATE = int(os.getenv("GROQ_COMPLETION_TOKENS_ESTIMATE", "1500"))
+
+_request_limiter = RateLimiter(REQUESTS_PER_MINUTE)
+_token_limiter = RateLimiter(TOKENS_PER_MINUTE)
+
+_client = None
+_client_lock = threading.Lock()
+
+def _get_api_key() -> str:
     api_key = os.getenv("GROQ_API_KEY")
     
     if not api_key:
         raise ValueError("❌ Error: GROQ_API_KEY not found. Please configure your .env file or system secrets.")
+    
+    return api_key
+
+def get_llm_client():
+    """
+    Returns the process-wide Groq API client (one connection pool per process).
+    Retries are handled by the rate-limit gateway, not by the SDK.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            from groq import Groq
+
+            _client = Groq(api_key=_get_api_key(), max_retries=0)
+        return _client
 
-    return Groq(api_key=api_key)
+def _estimate_tokens(prompt: str) -> int:
+    return estimate_tokens(prompt) + COMPLETION_TOKENS_ESTIMATE
 
-def generate_report(ticker: str, data: str, news: str) -> str:
+def _retry_delay(e: Exception, attempt: int):
     """
-    Generates an investment report using Groq's Llama 3.3 70B model.
-    Includes graceful error handling for rate limits and other API errors.
+    Returns the backoff before the next attempt, or None if e is not retryable.
+    """
+    from groq import RateLimitError, InternalServerError
+
+    if attempt >= MAX_RETRIES or not isinstance(e, (RateLimitError, InternalServerError)):
+        return None
+    retry_after = parse_retry_after(getattr(e.response, "headers", None))
+    if retry_after is not None:
+        # Hold back every queued caller, not just this one
+        _request_limiter.pause(retry_after)
+    delay = backoff_delay(attempt, retry_after)
+    print(f"[WRITER] Groq {e.status_code}, retrying in {delay:.1f}s (attempt {attempt + 1}/{MAX_RETRIES})...")
+    return delay
+
+def complete(prompt: str, **kwargs):
+    """
+    Rate-limited chat completion through the shared client.
+    Waits for a request and token slot, and retries 429/5xx responses with
+    jittered backoff that honors retry-after.
     """
     client = get_llm_client()
-    
+    tokens = _estimate_tokens(prompt)
+    attempt = 0
+    while True:
+        _request_limiter.acquire()
+        _token_limiter.acquire(tokens)
+        try:
+            return client.chat.completions.create(
+                model=MODEL,
+                messages=[{"role": "user", "content": prompt}],
+                **kwargs
+            )
+        except Exception as e:
+            delay = _retry_delay(e, attempt)
+            if delay is None:
+                raise
+            time.sleep(delay)
+            attempt += 1
+
+def build_prompt(ticker: str, data: str, news: str) -> str:
+    """
+    Builds the Writer prompt from the Analyst data and Researcher news.
+    Logs the estimated token count of each section and of the whole prompt.
+    """
     prompt = f"""You are a Senior Investment Banker. 
 Write a professional equity research report for: {ticker}.
 
@@ -38,21 +121,67 @@ Structure using EXACTLY these Markdown headers:
 ### Quantitative Data
 ### Risk Factors
 ### Legal Notice"""
+    print(
+        f"[WRITER] Prompt for {ticker}: ~{estimate_tokens(prompt)} tokens "
+        f"(data ~{estimate_tokens(data)}, news ~{estimate_tokens(news)})"
+    )
+    return prompt
+
+def _log_usage(ticker: str, usage, s: dict):
+    if usage is not None:
+        s.update(prompt_tokens=usage.prompt_tokens, completion_tokens=usage.completion_tokens)
+        print(f"[WRITER] Groq usage for {ticker}: {usage.prompt_tokens} prompt + {usage.completion_tokens} completion tokens")
+
+def _chunk_usage(chunk):
+    # Groq reports usage on the last stream chunk, under x_groq
+    return getattr(chunk, "usage", None) or getattr(getattr(chunk, "x_groq", None), "usage", None)
 
-    try:
-        response = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0  # We want precise data, not creativity
-        )
-        return response.choices[0].message.content
+def generate_report_stream(ticker: str, data: str, news: str):
+    """
+    Generates an investment report using Groq's Llama 3.3 70B model.
+    Yields the report text in chunks as Groq produces them; a cached report
+    is yielded as a single chunk. The full text is cached once complete.
+    Rate limits and other API errors are re-raised with friendly messages.
+    """
+    prompt = build_prompt(ticker, data, news)
+    cache_key = make_key(MODEL, prompt, TEMPERATURE)
+    with span("groq.completion", ticker=ticker, model=MODEL, prompt_tokens_est=estimate_tokens(prompt), stream=True) as s:
+        cached = report_cache.get(cache_key)
+        if cached is not None:
+            s["cache"] = "hit"
+            print(f"[WRITER] Cache hit for {ticker}, skipping LLM call.")
+            yield cached
+            return
+
+        s["cache"] = "miss"
+        started = time.perf_counter()
+        parts = []
+        try:
+            for chunk in complete(prompt, temperature=TEMPERATURE, stream=True):
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    if not parts:
+                        s["first_token_ms"] = round((time.perf_counter() - started) * 1000, 1)
+                    parts.append(delta)
+                    yield delta
+                _log_usage(ticker, _chunk_usage(chunk), s)
+        
+        except Exception as e:
+            _raise_friendly_error(e)
     
-    except RateLimitError:
+    report_cache.set(cache_key, "".join(parts))
+
+def _raise_friendly_error(e: Exception):
+    """
+    Re-raises API errors with user-facing messages.
+    """
+    from groq import RateLimitError
+
+    if isinstance(e, RateLimitError):
         # Graceful handling for rate limit errors
         error_msg = "⚠️ Alta demanda de tráfico. El sistema ha alcanzado su límite de velocidad (Rate Limit). Por favor espera 30 segundos y vuelve a intentar."
-        raise RateLimitError(error_msg)
+        raise RateLimitError(error_msg, response=e.response, body=e.body) from e
     
-    except Exception as e:
-        # Catch any other unexpected errors
-        error_msg = f"❌ Error inesperado al generar el reporte: {str(e)}"
-        raise Exception(error_msg)
\ No newline at end of file
+    # Catch any other unexpected errors
+    error_msg = f"❌ Error inesperado al generar el reporte: {str(e)}"
+    raise Exception(error_msg) from e
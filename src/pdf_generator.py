@@ -1,8 +1,11 @@
 # src/pdf_generator.py
 from fpdf import FPDF
+import io
 import re
 import os
 
+from src.telemetry import span
+
 class InvestmentReportPDF(FPDF):
     def __init__(self):
         super().__init__()
@@ -42,37 +45,162 @@ class InvestmentReportPDF(FPDF):
         self.multi_cell(0, 7, clean_text)
         self.ln(5)
 
+    def add_report(self, ticker, report_text, chart=None):
+        """
+        Writes one ticker's report (title, sections and chart) from the current page.
+        chart can be an image path or a file-like object.
+        """
+        # Title Header
+        self.set_font('Arial', 'B', 20)
+        self.cell(0, 15, f'EQUITY RESEARCH: {ticker}', 0, 1, 'C')
+        self.ln(5)
+
+        segments = re.split(r'###\s+', report_text)
+        
+        for segment in segments:
+            if not segment.strip(): continue
+            lines = segment.split('\n', 1)
+            if len(lines) > 1:
+                title = lines[0].strip()
+                body = lines[1].strip()
+                
+                self.add_section_title(title)
+                self.add_section_body(body)
+                
+                # --- INSERT CHART HERE ---
+                # If we just finished the Quantitative Data section, add the image
+                if "Quantitative Data" in title and chart:
+                    # pdf.image(name, x, y, width)
+                    self.image(chart, x=15, w=180) 
+                    self.ln(5)
+            else:
+                self.add_section_body(segment)
+
 # src/pdf_generator.py
 
-def create_pdf(ticker, report_text, save_path, chart_path=None):
+def create_pdf(ticker, report_text, save_path=None, chart=None):
+    """
+    Renders the report to save_path and returns the path.
+    With save_path=None the PDF is built in memory and returned as bytes.
+    chart can be PNG bytes (as produced by the Analyst) or an image file path.
+    """
+    if isinstance(chart, (bytes, bytearray)):
+        chart = io.BytesIO(chart) if chart else None
+    elif chart and not os.path.exists(chart):
+        chart = None
+
+    with span("pdf.build", ticker=ticker) as s:
+        pdf = InvestmentReportPDF()
+        pdf.add_page()
+        pdf.add_report(ticker, report_text, chart)
+
+        if save_path is None:
+            output = bytes(pdf.output())
+            s["bytes"] = len(output)
+            return output
+        pdf.output(save_path)
+    return save_path
+
+# --- MULTI-TICKER COMPENDIUM ---
+
+# Chart width on the page is 180mm; ~150 dpi is plenty for print
+CHART_MAX_WIDTH_PX = 1063
+# Table-of-contents lines per page (fits below the heading on the first page)
+TOC_ENTRIES_PER_PAGE = 24
+
+def _prepare_chart(item):
+    """
+    Process-pool worker: produces a print-ready JPEG for one ticker.
+    Rasterizes the chart from item["history"] (OHLCV frame) when no PNG was
+    supplied, then downsizes and re-encodes it as JPEG, which fpdf2 embeds
+    as-is instead of decoding and recompressing a PNG in the main process.
+    """
+    from PIL import Image
+
+    png = item.get("chart_png")
+    if not png and item.get("history") is not None and not item["history"].empty:
+        from src.tools.charts import render_chart
+        png = render_chart(item["ticker"], item["history"])
+    if not png:
+        return item["ticker"], None
+
+    image = Image.open(io.BytesIO(png)).convert("RGB")
+    if image.width > CHART_MAX_WIDTH_PX:
+        height = round(image.height * CHART_MAX_WIDTH_PX / image.width)
+        image = image.resize((CHART_MAX_WIDTH_PX, height), Image.LANCZOS)
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=85, optimize=True)
+    return item["ticker"], buffer.getvalue()
+
+def _render_toc(pdf, outline):
+    pdf.set_font('Arial', 'B', 16)
+    pdf.cell(0, 12, 'TABLE OF CONTENTS', 0, 1, 'L')
+    pdf.ln(4)
+    pdf.set_font('Arial', '', 11)
+    for index, section in enumerate(outline):
+        # Explicit breaks: the placeholder needs its exact page count up front
+        if index and index % TOC_ENTRIES_PER_PAGE == 0:
+            pdf.add_page()
+        link = pdf.add_link(page=section.page_number)
+        pdf.cell(170, 8, section.name, 0, 0, 'L', link=link)
+        pdf.cell(0, 8, str(section.page_number), 0, 1, 'R', link=link)
+
+def create_compendium(reports, save_path=None, title="Research Pack", max_workers=None):
+    """
+    Builds one combined research pack: cover, table of contents and one
+    section per ticker (same layout as create_pdf), with bookmarks.
+
+    reports: iterable of dicts with "ticker" and "final_report", plus either
+        "chart_png" (as returned by run_analysis / run_analysis_many) or
+        "history" (an OHLCV frame to rasterize). Entries with an "error"
+        key are skipped.
+
+    Chart rasterization and image encoding, the expensive per-ticker work,
+    run in a process pool. fpdf2 cannot import pages produced by another
+    process, so the text layout and final assembly happen here; with the
+    charts pre-encoded that pass is cheap.
+    Returns the PDF bytes when save_path is None, else the path.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    reports = [r for r in reports if not r.get("error") and r.get("final_report")]
+    jobs = [
+        {"ticker": r["ticker"], "chart_png": r.get("chart_png"), "history": r.get("history")}
+        for r in reports
+    ]
+    print(f"[PDF] Preparing {len(jobs)} charts in parallel...")
+    with span("pdf.charts", charts=len(jobs)):
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            charts = dict(pool.map(_prepare_chart, jobs))
+
     pdf = InvestmentReportPDF()
     pdf.add_page()
-    
-    # Title Header
-    pdf.set_font('Arial', 'B', 20)
-    pdf.cell(0, 15, f'EQUITY RESEARCH: {ticker}', 0, 1, 'C')
-    pdf.ln(5)
-
-    segments = re.split(r'###\s+', report_text)
-    
-    for segment in segments:
-        if not segment.strip(): continue
-        lines = segment.split('\n', 1)
-        if len(lines) > 1:
-            title = lines[0].strip()
-            body = lines[1].strip()
-            
-            pdf.add_section_title(title)
-            pdf.add_section_body(body)
-            
-            # --- INSERT CHART HERE ---
-            # If we just finished the Quantitative Data section, add the image
-            if "Quantitative Data" in title and chart_path and os.path.exists(chart_path):
-                # pdf.image(name, x, y, width)
-                pdf.image(chart_path, x=15, w=180) 
-                pdf.ln(5)
-        else:
-            pdf.add_section_body(segment)
-
-    pdf.output(save_path)
-    return save_path
\ No newline at end of file
+    pdf.set_font('Arial', 'B', 24)
+    pdf.ln(60)
+    pdf.cell(0, 15, title.upper(), 0, 1, 'C')
+    pdf.set_font('Arial', '', 12)
+    pdf.cell(0, 10, f'{len(reports)} companies', 0, 1, 'C')
+
+    pdf.add_page()
+    # Leaves the document on a fresh page, ready for the first section
+    pdf.insert_toc_placeholder(
+        _render_toc,
+        pages=max(1, -(-len(reports) // TOC_ENTRIES_PER_PAGE)),
+        reset_page_indices=False
+    )
+
+    with span("pdf.build", reports=len(reports)) as s:
+        for index, report in enumerate(reports):
+            ticker = report["ticker"]
+            if index:
+                pdf.add_page()
+            pdf.start_section(ticker)
+            chart = charts.get(ticker)
+            pdf.add_report(ticker, report["final_report"], io.BytesIO(chart) if chart else None)
+
+        if save_path is None:
+            output = bytes(pdf.output())
+            s["bytes"] = len(output)
+            return output
+        pdf.output(save_path)
+    return save_path
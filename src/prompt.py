@@ -0,0 +1,156 @@
+# src/prompt.py
+import os
+
+import numpy as np
+import pandas as pd
+
+# Token budget per Writer prompt section (override via environment)
+SECTION_BUDGETS = {
+    "profile": int(os.getenv("PROMPT_BUDGET_PROFILE", "200")),
+    "prices": int(os.getenv("PROMPT_BUDGET_PRICES", "200")),
+    "news": int(os.getenv("PROMPT_BUDGET_NEWS", "400")),
+}
+
+# Llama-family tokenizers average roughly 4 characters per English token
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Approximate token count (no tokenizer dependency).
+    """
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def truncate_to_budget(text: str, max_tokens: int) -> str:
+    """
+    Cuts text to roughly max_tokens, on a word boundary.
+    """
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    if max_chars <= 3:
+        # No room for any text next to the ellipsis (e.g. a zero budget)
+        return ""
+    cut = text[:max_chars - 3].rsplit(' ', 1)[0]
+    return cut.rstrip(' ,.;:') + "..."
+
+
+def _pct(new: float, old: float) -> str:
+    return f"{(new / old - 1) * 100:+.1f}%" if old else "n/a"
+
+
+def _human(n: float) -> str:
+    for unit, size in (("B", 1e9), ("M", 1e6), ("K", 1e3)):
+        if abs(n) >= size:
+            return f"{n / size:.2f}{unit}"
+    return f"{n:.0f}"
+
+
+def _fmt(value: float, spec: str = ".2f") -> str:
+    return "n/a" if value is None or np.isnan(value) else format(value, spec)
+
+
+def indicator_summary(ind: dict) -> list:
+    """
+    Two compact lines for the latest RSI, MACD, Bollinger, ATR and EMA values.
+    """
+    return [
+        f"RSI14: {_fmt(ind['rsi_14'], '.1f')} | MACD {_fmt(ind['macd'])} "
+        f"(signal {_fmt(ind['macd_signal'])}, hist {_fmt(ind['macd_hist'], '+.2f')})",
+        f"Bollinger(20,2): {_fmt(ind['bb_lower'])}-{_fmt(ind['bb_upper'])} | ATR14 {_fmt(ind['atr_14'])} "
+        f"| EMA12/26 {_fmt(ind['ema_12'])}/{_fmt(ind['ema_26'])}",
+    ]
+
+
+# Return horizons reported to the Writer (skipped when the window is shorter)
+HORIZONS = [
+    ("1D", pd.DateOffset(days=1)), ("1W", pd.DateOffset(weeks=1)),
+    ("1M", pd.DateOffset(months=1)), ("3M", pd.DateOffset(months=3)),
+    ("6M", pd.DateOffset(months=6)), ("1Y", pd.DateOffset(years=1)),
+    ("3Y", pd.DateOffset(years=3)), ("5Y", pd.DateOffset(years=5)),
+]
+
+
+def horizon_returns(hist) -> list:
+    """
+    Returns (label, pct string) for each horizon the window covers, measured
+    by calendar date so it works for daily, weekly or monthly bars.
+    """
+    index, close = hist.index, hist['Close'].to_numpy(dtype=float)
+    spacing = (index[1:] - index[:-1]).min() if len(index) > 1 else None
+    out = []
+    for label, offset in HORIZONS:
+        target = index[-1] - offset
+        # Skip horizons finer than the bar size or longer than the window
+        if spacing is None or index[-1] - target < spacing or target < index[0]:
+            continue
+        pos = index.searchsorted(target, side="right") - 1
+        out.append((label, _pct(close[-1], close[pos])))
+    return out
+
+
+def price_summary(hist, indicators: dict = None) -> str:
+    """
+    Compact derived facts for an OHLCV frame: multi-horizon returns, range,
+    drawdown, SMA position, volatility and volume statistics, plus the
+    technical indicators if given. Replaces the raw date-indexed close dump,
+    so the prompt size does not grow with the history window.
+    """
+    close = hist['Close'].to_numpy(dtype=float)
+    volume = hist['Volume'].to_numpy(dtype=float)
+    last = close[-1]
+    n = len(close)
+    years = max((hist.index[-1] - hist.index[0]).days / 365.25, 1e-9)
+
+    returns = ", ".join(f"{label} {pct}" for label, pct in horizon_returns(hist))
+    lines = [
+        f"Period: {hist.index[0]:%Y-%m-%d} to {hist.index[-1]:%Y-%m-%d} ({n} bars)",
+        f"Last close: {last:.2f} | Returns: {returns + ', ' if returns else ''}period {_pct(last, close[0])}",
+        f"Range: open {hist['Open'].iloc[0]:.2f}, high {hist['High'].max():.2f}, low {hist['Low'].min():.2f}",
+    ]
+    if years >= 1:
+        year = hist[hist.index >= hist.index[-1] - pd.DateOffset(years=1)]
+        high_52w = year['High'].max()
+        lines.append(f"52W: high {high_52w:.2f}, low {year['Low'].min():.2f} (price {_pct(last, high_52w)} vs high)")
+    drawdown = (close / np.maximum.accumulate(close) - 1).min()
+    lines.append(f"Max drawdown: {drawdown * 100:.1f}%")
+    if n >= 20:
+        sma_20 = close[-20:].mean()
+        lines.append(f"SMA20: {sma_20:.2f} (price {_pct(last, sma_20)} vs SMA)")
+    if n > 2:
+        per_bar = (np.diff(close) / close[:-1]).std()
+        bars_per_year = (n - 1) / years
+        lines.append(f"Volatility: {per_bar * 100:.2f}% per bar ({per_bar * np.sqrt(bars_per_year) * 100:.1f}% annualized)")
+    avg_vol, std_vol = volume.mean(), volume.std()
+    z = (volume[-1] - avg_vol) / std_vol if std_vol else 0.0
+    lines.append(f"Volume: last {_human(volume[-1])}, avg {_human(avg_vol)} (z {z:+.1f})")
+    if indicators:
+        lines.extend(indicator_summary(indicators))
+    return truncate_to_budget("\n".join(lines), SECTION_BUDGETS["prices"])
+
+
+def profile_summary(info: dict) -> str:
+    """
+    Company name, sector and a business summary truncated to the profile budget.
+    """
+    header = (
+        f"Company: {info.get('longName', 'N/A')}\n"
+        f"Sector: {info.get('sector', 'N/A')}\n"
+        "Summary: "
+    )
+    budget = max(SECTION_BUDGETS["profile"] - estimate_tokens(header), 0)
+    summary = truncate_to_budget(info.get('longBusinessSummary', 'N/A'), budget)
+    return header + summary
+
+
+def news_summary(results: list) -> str:
+    """
+    One line per search result, with the news budget split evenly across them.
+    """
+    if not results:
+        return ""
+    per_item = max(SECTION_BUDGETS["news"] // len(results), 1)
+    return "\n".join(
+        truncate_to_budget(f"- {r['title']}: {r['body']}", per_item) for r in results
+    )
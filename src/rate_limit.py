@@ -0,0 +1,70 @@
+# src/rate_limit.py
+import random
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Process-wide token bucket implemented as a reservation queue (GCRA).
+
+    Each caller reserves its units and is told how long to wait. Reservations
+    are handed out in call order, so waiting callers are served first-come
+    first-served and nobody can starve behind later arrivals.
+    """
+
+    def __init__(self, per_minute: float, burst: float = None):
+        self.per_minute = per_minute
+        self.interval = 60.0 / per_minute          # seconds per unit
+        self.burst = burst if burst is not None else per_minute
+        self._tat = 0.0                            # theoretical arrival time
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float = 1) -> float:
+        """
+        Reserves `amount` units and returns the seconds to wait before using them.
+        """
+        with self._lock:
+            now = time.monotonic()
+            tat = max(self._tat, now)
+            self._tat = tat + amount * self.interval
+            return max(0.0, self._tat - self.burst * self.interval - now)
+
+    def pause(self, seconds: float):
+        """
+        Blocks new reservations for `seconds` (e.g., after a 429 with retry-after).
+        """
+        with self._lock:
+            resume_at = time.monotonic() + seconds
+            # Drain the bucket: the first caller resumes at resume_at and the
+            # rest are spaced at the sustained rate, not released as a burst
+            self._tat = max(self._tat, resume_at + (self.burst - 1) * self.interval)
+
+    def acquire(self, amount: float = 1):
+        delay = self.reserve(amount)
+        if delay:
+            time.sleep(delay)
+
+
+def backoff_delay(attempt: int, retry_after: float = None, base: float = 1.0, cap: float = 30.0) -> float:
+    """
+    Seconds to wait before retry number `attempt` (0-based).
+    Honors the server's retry-after when given, plus a little jitter so that
+    queued callers don't retry in lockstep; otherwise full-jitter exponential.
+    """
+    if retry_after is not None:
+        return retry_after + random.uniform(0, base)
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def parse_retry_after(headers) -> float:
+    """
+    Reads the retry-after header (seconds) from an HTTP response, if any.
+    """
+    if headers is None:
+        return None
+    value = headers.get("retry-after")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
@@ -0,0 +1,84 @@
+# src/refresh.py
+"""
+Incremental refresh of reports.
+
+Every run records a fingerprint of each stage's inputs (the news as the
+Writer sees it, the OHLCV frame, the company profile) together with the
+stage outputs. When the same ticker and history window is requested again,
+the pipeline compares fingerprints: the Analyst is skipped when prices and
+profile are unchanged, and writer_policy decides whether changed inputs
+are material enough to pay for a new Writer completion.
+"""
+import base64
+import hashlib
+import os
+import time
+
+import pandas as pd
+
+from src.cache import TieredCache, make_key
+
+# Prior runs are kept this long (seconds, 0 disables incremental refresh)
+REFRESH_TTL = float(os.getenv("REFRESH_TTL", "86400"))
+# Price move since the report was written (percent) that triggers a rewrite
+REFRESH_PRICE_MOVE = float(os.getenv("REFRESH_PRICE_MOVE", "1.0"))
+# A report older than this (seconds) is rewritten whenever its inputs changed
+REFRESH_MAX_AGE = float(os.getenv("REFRESH_MAX_AGE", "21600"))
+
+run_store = TieredCache("report_runs", ttl=REFRESH_TTL, max_entries=64)
+
+
+def run_key(ticker: str, period: str, interval: str) -> str:
+    return make_key("run", ticker.upper(), period, interval)
+
+
+def text_fingerprint(text: str) -> str:
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+
+def frame_fingerprint(data: pd.DataFrame) -> str:
+    """
+    Content hash of an OHLCV frame (values and index).
+    """
+    if data is None or data.empty:
+        return "empty"
+    return hashlib.sha256(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes()).hexdigest()
+
+
+def encode_analyst(result: dict) -> dict:
+    # The store holds JSON: the chart PNG is kept as base64
+    return {**result, "chart_png": base64.b64encode(result.get("chart_png") or b"").decode("ascii")}
+
+
+def decode_analyst(stored: dict) -> dict:
+    return {**stored, "chart_png": base64.b64decode(stored.get("chart_png") or "")}
+
+
+def writer_policy(report: dict, inputs: dict, close: float, signal: str):
+    """
+    Decides whether the previous report can be served for the current inputs.
+
+    report is the basis the previous report was written on: the input
+    fingerprints, last close and technical signal at that time, and when it
+    was written. Returns the reason for a new Writer call, or None to reuse it.
+    """
+    if not report or not report.get("text"):
+        return "no previous report"
+    written = report["inputs"]
+    if inputs["news"] != written["news"]:
+        return "news changed"
+    if inputs["profile"] != written["profile"]:
+        return "company profile changed"
+    if inputs["prices"] == written["prices"]:
+        return None
+    # Only prices moved: rewrite if the report is stale or the move is material
+    if time.time() - report["created_at"] > REFRESH_MAX_AGE:
+        return f"prices changed and report is older than {REFRESH_MAX_AGE / 3600:g}h"
+    if signal != report.get("signal"):
+        return f"signal changed to {signal}"
+    if close is None or not report.get("close"):
+        return "prices changed"
+    move = abs(close / report["close"] - 1) * 100
+    if move >= REFRESH_PRICE_MOVE:
+        return f"price moved {move:.1f}%"
+    return None
@@ -0,0 +1,115 @@
+# src/telemetry.py
+"""
+Timing spans for pipeline stages and external calls.
+
+    with trace("AAPL") as t:              # one per report run
+        with span("ddgs.search") as s:    # one per stage / external call
+            s["cache"] = "miss"
+
+Every finished span is written as one JSON line to TELEMETRY_LOG and, if a
+trace is active in the current context, collected on it so the caller can
+show a per-run breakdown. Spans carry their duration plus whatever
+attributes the call site sets (cache hit/miss, token counts, sizes).
+"""
+import contextvars
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+# JSON-lines sink: a file path, "-" for stderr, or "" to disable
+TELEMETRY_LOG = os.getenv("TELEMETRY_LOG", ".cache/telemetry.jsonl")
+
+_current_trace = contextvars.ContextVar("telemetry_trace", default=None)
+_write_lock = threading.Lock()
+
+
+class Trace:
+    """
+    The spans recorded during one pipeline run.
+    """
+
+    def __init__(self, name: str, **attrs):
+        self.id = uuid.uuid4().hex[:12]
+        self.name = name
+        self.attrs = attrs
+        self.spans = []
+
+    def totals(self) -> dict:
+        """
+        Summed duration (ms) per span name.
+        """
+        out = {}
+        for s in self.spans:
+            out[s["name"]] = out.get(s["name"], 0.0) + s["duration_ms"]
+        return out
+
+
+def current_trace():
+    return _current_trace.get()
+
+
+@contextmanager
+def trace(name: str, **attrs):
+    """
+    Collects the spans of one run. Threads started with
+    contextvars.copy_context() (and asyncio tasks) report to it as well.
+    Nested calls join the enclosing trace, so a caller can wrap extra work
+    (e.g., ticker validation) around a pipeline run.
+    """
+    if _current_trace.get() is not None:
+        yield _current_trace.get()
+        return
+    t = Trace(name, **attrs)
+    token = _current_trace.set(t)
+    try:
+        yield t
+    finally:
+        try:
+            _current_trace.reset(token)
+        except ValueError:
+            # Generator closed from another context (e.g. abandoned stream)
+            _current_trace.set(None)
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """
+    Times the enclosed block. Yields the span record (a dict) so the call
+    site can attach attributes; exceptions are recorded and re-raised.
+    """
+    t = _current_trace.get()
+    record = {"name": name, "trace": t.id if t else None, "run": t.name if t else None, **attrs}
+    record["ts"] = round(time.time(), 3)
+    start = time.perf_counter()
+    try:
+        yield record
+    except BaseException as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        record["duration_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        if t is not None:
+            t.spans.append(record)
+        _emit(record)
+
+
+def _emit(record: dict):
+    if not TELEMETRY_LOG:
+        return
+    line = json.dumps(record, default=str, ensure_ascii=False)
+    try:
+        with _write_lock:
+            if TELEMETRY_LOG == "-":
+                print(line, file=sys.stderr)
+                return
+            directory = os.path.dirname(TELEMETRY_LOG)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(TELEMETRY_LOG, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+    except OSError as e:
+        print(f"[WARNING] Telemetry write error: {e}")
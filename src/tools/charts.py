@@ -0,0 +1,129 @@
+# src/tools/charts.py
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from src.telemetry import span
+from src.tools.market_data import resample_ohlcv
+
+# Longer series are resampled into coarser bars before plotting
+CHART_MAX_BARS = int(os.getenv("CHART_MAX_BARS", "150"))
+DOWNSAMPLE_RULES = [("W-FRI", "weekly"), ("ME", "monthly"), ("QE", "quarterly"), ("YE", "yearly")]
+
+# pyplot keeps global state: only one chart may be rendered at a time per process
+_render_lock = threading.Lock()
+
+
+class ChartCache:
+    """
+    LRU cache of rendered PNGs, bounded by total size in bytes.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.stats = {"hits": 0, "misses": 0}
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            png = self._entries.get(key)
+            if png is None:
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return png
+
+    def set(self, key: str, png: bytes):
+        if len(png) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._size -= len(self._entries.pop(key))
+            self._entries[key] = png
+            self._size += len(png)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+
+chart_cache = ChartCache(int(float(os.getenv("CHART_CACHE_MB", "64")) * 1024 * 1024))
+
+
+def chart_key(data: pd.DataFrame, **params) -> str:
+    """
+    Content hash of the OHLCV frame (index included) plus the render parameters.
+    """
+    digest = hashlib.sha256(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    digest.update(repr(sorted(params.items())).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def downsample_for_chart(data: pd.DataFrame, max_bars: int = CHART_MAX_BARS):
+    """
+    Resamples OHLCV bars into the finest of weekly/monthly/quarterly/yearly
+    bars that fits in max_bars. Real OHLC aggregation (not point sampling)
+    keeps the highs, lows and overall shape of the series.
+    Returns (frame, label), with label None when no resampling was needed.
+    """
+    if len(data) <= max_bars:
+        return data, None
+    for rule, label in DOWNSAMPLE_RULES:
+        bars = resample_ohlcv(data, rule)
+        if len(bars) <= max_bars:
+            return bars, label
+    return bars, label
+
+
+def render_chart(ticker: str, data: pd.DataFrame, style: str = 'charles', mav=(20,), figsize=(12, 8)) -> bytes:
+    """
+    Renders a candlestick + volume chart with moving averages to PNG bytes.
+    Series longer than CHART_MAX_BARS are downsampled first, so render time
+    and PNG size stay flat for multi-year windows. Identical data and
+    parameters (e.g., outside market hours) are served from the chart cache
+    without touching matplotlib.
+    """
+    # Clean index for mplfinance
+    data = data[['Open', 'High', 'Low', 'Close', 'Volume']].copy()
+    if data.index.tz is not None:
+        data.index = data.index.tz_localize(None)
+
+    with span("mplfinance.render", ticker=ticker, bars=len(data)) as s:
+        key = chart_key(
+            data, ticker=ticker, style=style, mav=tuple(mav), figsize=tuple(figsize), max_bars=CHART_MAX_BARS
+        )
+        png = chart_cache.get(key)
+        if png is not None:
+            s.update(cache="hit", bytes=len(png))
+            return png
+
+        data, label = downsample_for_chart(data)
+        title = f"\n{ticker} - Technical Analysis" + (f" ({label} bars)" if label else "")
+
+        buffer = io.BytesIO()
+        with _render_lock:
+            # Imported on first render: matplotlib + mplfinance are the slowest imports in the app
+            import matplotlib
+            matplotlib.use('Agg')
+            import mplfinance as mpf
+
+            mpf.plot(
+                data,
+                type='candle',
+                style=style,
+                title=title,
+                volume=True,
+                mav=tuple(mav),
+                savefig=dict(fname=buffer, format='png'),
+                figsize=figsize
+            )
+        png = buffer.getvalue()
+        s.update(cache="miss", bytes=len(png), plotted_bars=len(data))
+        chart_cache.set(key, png)
+        return png
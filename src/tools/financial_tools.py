@@ -1,37 +1,35 @@
 # src/tools/financial_tools.py
-import yfinance as yf
+from src.prompt import price_summary, profile_summary
+from src.tools.market_data import MarketSnapshot
 
-def get_stock_prices(ticker: str):
+def get_stock_prices(ticker: str, snapshot: MarketSnapshot = None):
     """
-    Retrieves historical stock prices for the last month for a given ticker (e.g., AAPL, MELI).
-    Returns a summary string of closing prices.
+    Retrieves historical stock prices for the configured window (default: last month) for a given ticker (e.g., AAPL, MELI).
+    Returns a compact summary string (returns, range, SMA, volatility, volume).
+    Pass a shared snapshot to reuse data already fetched for this run.
     """
     try:
-        stock = yf.Ticker(ticker)
-        # Fetch 1 month of history
-        hist = stock.history(period="1mo")
-        
+        snapshot = snapshot or MarketSnapshot(ticker)
+        hist = snapshot.history
+
         if hist.empty:
             return f"Error: No data found for ticker {ticker}."
-        
-        # Return formatted string (LLMs read text better than raw dataframe objects)
-        return hist['Close'].to_string()
+
+        # Return derived facts, not raw rows: same signal in a fraction of the tokens
+        return price_summary(hist, snapshot.indicators)
     except Exception as e:
         return f"Error fetching data: {str(e)}"
 
-def get_company_info(ticker: str):
+def get_company_info(ticker: str, snapshot: MarketSnapshot = None):
     """
     Retrieves the company profile, sector, and business summary.
+    Pass a shared snapshot to reuse data already fetched for this run.
     """
     try:
-        stock = yf.Ticker(ticker)
-        info = stock.info
-        
-        # We extract only the relevant parts to save tokens
-        return (
-            f"Company: {info.get('longName', 'N/A')}\n"
-            f"Sector: {info.get('sector', 'N/A')}\n"
-            f"Summary: {info.get('longBusinessSummary', 'N/A')}"
-        )
+        snapshot = snapshot or MarketSnapshot(ticker)
+        info = snapshot.info
+
+        # We extract only the relevant parts (within the profile token budget)
+        return profile_summary(info)
     except Exception as e:
-        return f"Error fetching info: {str(e)}"
\ No newline at end of file
+        return f"Error fetching info: {str(e)}"
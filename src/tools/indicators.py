@@ -0,0 +1,158 @@
+# src/tools/indicators.py
+"""
+Vectorized technical indicators over a (tickers x days) matrix.
+
+Every function takes 2-D float arrays with one row per ticker and one
+column per session (oldest first) and returns an array of the same shape,
+so a whole watchlist is computed in one NumPy pass instead of one pandas
+pipeline per ticker. Each row holds that ticker's own sessions, aligned on
+the right (latest session in the last column) and NaN-padded on the left,
+so a ticker that skipped a session another one traded is not broken up.
+
+SMA, Bollinger, volume z-score, RSI and ATR are NaN until their window is
+full. EMAs (and MACD, built on them) are seeded with the first session and
+are defined from the first bar on.
+"""
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+FIELDS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+def to_matrix(histories: dict):
+    """
+    Stacks per-ticker OHLCV frames into one matrix per field. Rows are
+    right-aligned: column -1 is each ticker's latest session, and shorter
+    histories are NaN-padded at the start.
+    Returns (tickers, {field: 2-D array}).
+    """
+    tickers = list(histories)
+    frames = [histories[t][FIELDS].dropna(subset=['Close']) for t in tickers]
+    width = max((len(f) for f in frames), default=0)
+    matrix = {}
+    for field in FIELDS:
+        out = np.full((len(tickers), width), np.nan)
+        for row, frame in enumerate(frames):
+            if len(frame):
+                out[row, width - len(frame):] = frame[field].to_numpy(dtype=float)
+        matrix[field] = out
+    return tickers, matrix
+
+
+def _sessions(x: np.ndarray) -> np.ndarray:
+    """
+    Number of sessions each row has seen up to each column (1 on its first bar).
+    """
+    return np.cumsum(~np.isnan(x), axis=1)
+
+
+def _rolling(x: np.ndarray, window: int, fn) -> np.ndarray:
+    out = np.full(x.shape, np.nan)
+    if x.shape[1] >= window:
+        out[:, window - 1:] = fn(sliding_window_view(x, window, axis=1), axis=-1)
+    return out
+
+
+def sma(x: np.ndarray, window: int) -> np.ndarray:
+    return _rolling(x, window, np.mean)
+
+
+def rolling_std(x: np.ndarray, window: int) -> np.ndarray:
+    return _rolling(x, window, np.std)
+
+
+def ema(x: np.ndarray, span: int = None, alpha: float = None) -> np.ndarray:
+    """
+    Exponential moving average along the day axis, seeded with the first
+    valid value of each row. Recursive over days, vectorized over tickers.
+    """
+    alpha = alpha if alpha is not None else 2.0 / (span + 1)
+    out = np.full(x.shape, np.nan)
+    prev = np.full(x.shape[0], np.nan)
+    for day in range(x.shape[1]):
+        value = x[:, day]
+        prev = np.where(np.isnan(prev), value, np.where(np.isnan(value), prev, alpha * value + (1 - alpha) * prev))
+        out[:, day] = prev
+    return out
+
+
+def rsi(close: np.ndarray, window: int = 14) -> np.ndarray:
+    """
+    Wilder's RSI (smoothing alpha = 1/window).
+    """
+    delta = np.diff(close, axis=1, prepend=np.nan)
+    gain = ema(np.clip(delta, 0, None), alpha=1.0 / window)
+    loss = ema(np.clip(-delta, 0, None), alpha=1.0 / window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out = 100 - 100 / (1 + gain / loss)
+    out[loss == 0] = 100.0
+    out[_sessions(close) <= window] = np.nan
+    return out
+
+
+def macd(close: np.ndarray, fast: int = 12, slow: int = 26, signal: int = 9):
+    """
+    Returns (macd line, signal line, histogram).
+    """
+    line = ema(close, fast) - ema(close, slow)
+    signal_line = ema(line, signal)
+    return line, signal_line, line - signal_line
+
+
+def bollinger(close: np.ndarray, window: int = 20, k: float = 2.0):
+    """
+    Returns (middle, upper, lower) bands.
+    """
+    middle = sma(close, window)
+    width = k * rolling_std(close, window)
+    return middle, middle + width, middle - width
+
+
+def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, window: int = 14) -> np.ndarray:
+    """
+    Average True Range with Wilder smoothing.
+    """
+    prev_close = np.concatenate([np.full((close.shape[0], 1), np.nan), close[:, :-1]], axis=1)
+    true_range = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+    out = ema(true_range, alpha=1.0 / window)
+    out[_sessions(close) < window] = np.nan
+    return out
+
+
+def volume_zscore(volume: np.ndarray, window: int = 20) -> np.ndarray:
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (volume - sma(volume, window)) / rolling_std(volume, window)
+
+
+def compute_indicators(histories: dict) -> dict:
+    """
+    Computes the latest value of every indicator for each ticker in one pass.
+    Returns {ticker: {indicator_name: float}} (NaN where the window is too short).
+    """
+    tickers, m = to_matrix({t: h for t, h in histories.items() if h is not None and not h.empty})
+    if not tickers:
+        return {}
+    close = m['Close']
+
+    middle, upper, lower = bollinger(close)
+    macd_line, macd_signal, macd_hist = macd(close)
+    columns = {
+        "sma_20": sma(close, 20),
+        "ema_12": ema(close, 12),
+        "ema_26": ema(close, 26),
+        "rsi_14": rsi(close),
+        "macd": macd_line,
+        "macd_signal": macd_signal,
+        "macd_hist": macd_hist,
+        "bb_middle": middle,
+        "bb_upper": upper,
+        "bb_lower": lower,
+        "atr_14": atr(m['High'], m['Low'], close),
+        "volume_z": volume_zscore(m['Volume']),
+    }
+
+    # Rows are right-aligned: the last column is every ticker's latest session
+    return {
+        ticker: {name: float(values[i, -1]) for name, values in columns.items()}
+        for i, ticker in enumerate(tickers)
+    }
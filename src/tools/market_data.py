@@ -0,0 +1,174 @@
+# src/tools/market_data.py
+import os
+
+import pandas as pd
+
+from src.telemetry import span
+from src.tools.indicators import compute_indicators
+from src.tools.price_store import get_price_store
+
+# History window and bar size (any yfinance period/interval, e.g. 1y / 1wk)
+DEFAULT_PERIOD = os.getenv("HISTORY_PERIOD", "1mo")
+DEFAULT_INTERVAL = os.getenv("HISTORY_INTERVAL", "1d")
+
+# Coarser bars that can be derived from the cached daily bars
+RESAMPLE_RULES = {"1wk": "W-FRI", "1mo": "ME", "3mo": "QE"}
+
+OHLCV_AGG = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}
+
+
+def resample_ohlcv(data: pd.DataFrame, rule: str) -> pd.DataFrame:
+    """
+    Aggregates OHLCV bars into coarser bars (e.g. 'W-FRI', 'ME'), keeping
+    each bar's open, high, low and close so candle shapes are preserved.
+    Each bar is labeled with its last session, not the period end: the
+    current, still open period would otherwise carry a future date.
+    """
+    bars = data[list(OHLCV_AGG)].resample(rule).agg(OHLCV_AGG)
+    bars['_last'] = data.index.to_series().resample(rule).max()
+    bars = bars.dropna(subset=['Close'])
+    bars.index = pd.DatetimeIndex(bars.pop('_last'), name=data.index.name)
+    return bars
+
+
+class MarketSnapshot:
+    """
+    Market data for one ticker, fetched once per pipeline run.
+    The same snapshot is handed to every consumer (validation, price text,
+    company profile, metrics and chart) so Yahoo is only hit once per field.
+    """
+
+    def __init__(self, ticker: str, period: str = None, history=None, info=None, interval: str = None):
+        self.ticker = ticker
+        self.period = period or DEFAULT_PERIOD
+        self.interval = interval or DEFAULT_INTERVAL
+        self._stock = None
+        self._history = history
+        self._info = info
+        self._indicators = None
+
+    @property
+    def stock(self):
+        if self._stock is None:
+            import yfinance as yf
+
+            self._stock = yf.Ticker(self.ticker)
+        return self._stock
+
+    @property
+    def history(self):
+        """
+        OHLCV DataFrame for the snapshot period and interval (fetched on
+        first access). Daily, weekly and monthly bars are served from the
+        on-disk price store when it is enabled; intraday bars bypass it.
+        A failed fetch yields an empty frame, so it is not retried.
+        """
+        if self._history is None:
+            try:
+                self._history = self._fetch_history()
+            except Exception as e:
+                print(f"[WARNING] Market data error for {self.ticker}: {e}")
+                # Cache the failure so downstream consumers don't retry the same call
+                self._history = pd.DataFrame()
+        return self._history
+
+    def _fetch_history(self) -> pd.DataFrame:
+        store = get_price_store()
+        if store is not None and self.interval == "1d":
+            return store.get_history(self.ticker, self.period)
+        if store is not None and self.interval in RESAMPLE_RULES:
+            daily = store.get_history(self.ticker, self.period)
+            return resample_ohlcv(daily, RESAMPLE_RULES[self.interval])
+        with span("yfinance.history", ticker=self.ticker, mode="direct",
+                  period=self.period, interval=self.interval) as s:
+            history = self.stock.history(period=self.period, interval=self.interval)
+            s["bars"] = len(history)
+        return history
+
+    @property
+    def info(self) -> dict:
+        """
+        Company profile dict from Yahoo (fetched on first access).
+        """
+        if self._info is None:
+            with span("yfinance.info", ticker=self.ticker):
+                self._info = self.stock.info or {}
+        return self._info
+
+    @property
+    def indicators(self) -> dict:
+        """
+        Latest technical indicators (see src/tools/indicators.py).
+        Batch runs assign them for the whole watchlist in one pass.
+        """
+        if self._indicators is None:
+            self._indicators = compute_indicators({self.ticker: self.history}).get(self.ticker, {})
+        return self._indicators
+
+    @indicators.setter
+    def indicators(self, values: dict):
+        self._indicators = values
+
+    @property
+    def is_valid(self) -> bool:
+        return not self.history.empty
+
+
+def fetch_snapshot(ticker: str, period: str = None, interval: str = None) -> MarketSnapshot:
+    """
+    Creates a snapshot for the ticker and eagerly loads its price history.
+    The company profile is loaded lazily, on the first consumer that needs it.
+    """
+    snapshot = MarketSnapshot(ticker, period=period, interval=interval)
+    snapshot.history
+    return snapshot
+
+
+def fetch_snapshots(tickers: list, period: str = None, interval: str = None) -> dict:
+    """
+    Bulk variant of fetch_snapshot for a watchlist.
+    Every ticker without fresh cached bars is fetched in a single
+    yf.download call instead of one Ticker.history request per symbol.
+    Returns a dict of ticker -> MarketSnapshot.
+    """
+    period = period or DEFAULT_PERIOD
+    interval = interval or DEFAULT_INTERVAL
+    # The store keeps daily bars; coarser intervals are resampled from them
+    store = get_price_store() if interval == "1d" or interval in RESAMPLE_RULES else None
+    missing = [t for t in tickers if store is None or not store.has_fresh(t, period)]
+
+    data = pd.DataFrame()
+    if missing:
+        print(f"[MARKET DATA] Bulk downloading {len(missing)} of {len(tickers)} tickers...")
+        try:
+            import yfinance as yf
+
+            with span("yfinance.download", tickers=len(missing), period=period):
+                data = yf.download(
+                    missing, period=period, interval="1d" if store is not None else interval,
+                    group_by="ticker",
+                    auto_adjust=True, threads=True, progress=False
+                )
+        except Exception as e:
+            print(f"[WARNING] Bulk download error: {e}")
+
+    snapshots = {}
+    for ticker in tickers:
+        if ticker not in missing:
+            # Served from the price store without touching the network
+            snapshots[ticker] = MarketSnapshot(ticker, period=period, interval=interval)
+            continue
+        if data.empty:
+            # Bulk call failed: fall back to a lazy per-ticker fetch
+            snapshots[ticker] = MarketSnapshot(ticker, period=period, interval=interval)
+            continue
+
+        hist = pd.DataFrame()
+        if isinstance(data.columns, pd.MultiIndex) and ticker in data.columns.get_level_values(0):
+            hist = data[ticker].dropna(subset=['Close'])
+        if store is not None and not hist.empty:
+            store.put_history(ticker, hist, period)
+            snapshots[ticker] = MarketSnapshot(ticker, period=period, interval=interval)
+        else:
+            snapshots[ticker] = MarketSnapshot(ticker, period=period, history=hist, interval=interval)
+    return snapshots
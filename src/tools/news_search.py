@@ -0,0 +1,95 @@
+# src/tools/news_search.py
+import os
+import re
+import threading
+from collections import defaultdict
+from difflib import SequenceMatcher
+from urllib.parse import urlsplit
+
+from src.cache import TieredCache, make_key
+from src.telemetry import span
+
+# Shared across sessions and processes through the on-disk tier
+search_cache = TieredCache(
+    "search_results",
+    ttl=float(os.getenv("SEARCH_CACHE_TTL", "1800")),
+    max_entries=int(os.getenv("SEARCH_CACHE_SIZE", "512")),
+)
+
+# Titles at least this similar are treated as the same story
+TITLE_SIMILARITY = 0.9
+# A trailing " - Suffix" this short is a publisher name; longer ones are part of the headline
+PUBLISHER_MAX_WORDS = 4
+
+_query_locks = defaultdict(threading.Lock)
+_query_locks_guard = threading.Lock()
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+def _normalize_url(url: str) -> str:
+    parts = urlsplit(url or "")
+    host = parts.netloc.lower().removeprefix("www.")
+    return f"{host}{parts.path.rstrip('/')}"
+
+
+def _normalize_title(title: str) -> str:
+    # Drop a trailing " - Publisher" / " | Publisher" suffix, punctuation and case
+    head, *suffix = re.split(r"\s[-|–]\s(?=[^-|–]*$)", title or "")
+    title = head if suffix and len(suffix[0].split()) <= PUBLISHER_MAX_WORDS else title or ""
+    return " ".join(re.sub(r"[^\w\s]", " ", title.lower()).split())
+
+
+def deduplicate(results: list) -> list:
+    """
+    Drops results whose URL, or near-identical title, was already seen.
+    Keeps the first occurrence (search engines rank the best copy first).
+    """
+    unique, urls, titles = [], set(), []
+    for r in results:
+        url = _normalize_url(r.get('href', ''))
+        title = _normalize_title(r.get('title', ''))
+        if url and url in urls:
+            continue
+        if title and any(SequenceMatcher(None, title, seen).ratio() >= TITLE_SIMILARITY for seen in titles):
+            continue
+        urls.add(url)
+        titles.append(title)
+        unique.append(r)
+    return unique
+
+
+def search_news(query: str, max_results: int = 5) -> list:
+    """
+    DuckDuckGo text search with a TTL cache keyed by the normalized query.
+    Returns up to max_results de-duplicated results (dicts with title, href, body).
+    Concurrent identical queries in this process wait for a single search.
+    """
+    with span("ddgs.search", query=query) as s:
+        key = make_key("ddgs", normalize_query(query), max_results)
+        cached = search_cache.get(key)
+        if cached is not None:
+            s.update(cache="hit", results=len(cached))
+            return cached
+
+        with _query_locks_guard:
+            lock = _query_locks[key]
+        with lock:
+            # Another thread may have filled the cache while we waited
+            cached = search_cache.get(key)
+            if cached is not None:
+                s.update(cache="hit", results=len(cached))
+                return cached
+
+            from duckduckgo_search import DDGS
+
+            # Over-fetch so there is room left after de-duplication
+            with DDGS() as ddgs:
+                raw = list(ddgs.text(query, max_results=max_results * 2))
+            results = deduplicate(raw)[:max_results]
+            s.update(cache="miss", results=len(results), raw_results=len(raw))
+            if results:
+                search_cache.set(key, results)
+            return results
@@ -0,0 +1,266 @@
+# src/tools/price_store.py
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import pandas as pd
+
+from src.telemetry import span
+
+MARKET_TZ = ZoneInfo("America/New_York")
+MARKET_OPEN = (9, 30)
+MARKET_CLOSE = (16, 0)
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+# While the market is open, cached bars are refreshed at most this often
+INTRADAY_TTL = int(os.getenv("PRICE_INTRADAY_TTL", "300"))
+
+
+def is_market_open(now: datetime = None) -> bool:
+    """
+    Regular NYSE/Nasdaq session check (Mon-Fri, 9:30-16:00 New York time).
+    Exchange holidays are treated as trading days.
+    """
+    now = (now or datetime.now(MARKET_TZ)).astimezone(MARKET_TZ)
+    if now.weekday() >= 5:
+        return False
+    minutes = now.hour * 60 + now.minute
+    return MARKET_OPEN[0] * 60 + MARKET_OPEN[1] <= minutes < MARKET_CLOSE[0] * 60 + MARKET_CLOSE[1]
+
+
+def last_market_close(now: datetime = None) -> datetime:
+    """
+    Returns the most recent session close at or before `now`.
+    """
+    now = (now or datetime.now(MARKET_TZ)).astimezone(MARKET_TZ)
+    day = now
+    while True:
+        close = day.replace(hour=MARKET_CLOSE[0], minute=MARKET_CLOSE[1], second=0, microsecond=0)
+        if day.weekday() < 5 and close <= now:
+            return close
+        day -= timedelta(days=1)
+
+
+def period_start(period: str, now: datetime = None):
+    """
+    Converts a yfinance period string ('5d', '1mo', '1y', 'ytd', 'max') into
+    the first calendar date it covers. Returns None for 'max'.
+    """
+    today = pd.Timestamp((now or datetime.now(MARKET_TZ)).astimezone(MARKET_TZ).date())
+    if period == "max":
+        return None
+    if period == "ytd":
+        return today.replace(month=1, day=1).date()
+    match = re.fullmatch(r"(\d+)(d|wk|mo|y)", period)
+    if not match:
+        raise ValueError(f"Unsupported period: {period}")
+    amount, unit = int(match.group(1)), match.group(2)
+    offsets = {
+        "d": pd.offsets.BDay(amount),
+        "wk": pd.DateOffset(weeks=amount),
+        "mo": pd.DateOffset(months=amount),
+        "y": pd.DateOffset(years=amount),
+    }
+    return (today - offsets[unit]).date()
+
+
+class PriceStore:
+    """
+    On-disk SQLite store of daily OHLCV bars per ticker.
+
+    The first request for a ticker downloads the requested period. Later
+    requests are served from disk, and only the bars after the last cached
+    date are downloaded, and only when the cached data can actually be stale:
+    after a new session close, or every INTRADAY_TTL seconds while the market
+    is open.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._ticker_locks = defaultdict(threading.Lock)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS bars ("
+                "ticker TEXT, date TEXT, open REAL, high REAL, low REAL, close REAL, volume REAL, "
+                "PRIMARY KEY (ticker, date))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta ("
+                "ticker TEXT PRIMARY KEY, covered_from TEXT, last_refresh REAL)"
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _ticker_lock(self, ticker: str):
+        # One lock per ticker: refreshes of different tickers run concurrently
+        with self._lock:
+            return self._ticker_locks[ticker]
+
+    # --- FRESHNESS ---
+    @staticmethod
+    def is_fresh(last_refresh: float, now: datetime = None) -> bool:
+        now = (now or datetime.now(MARKET_TZ)).astimezone(MARKET_TZ)
+        if is_market_open(now):
+            return now.timestamp() - last_refresh < INTRADAY_TTL
+        # Market closed: anything fetched after the last close is final
+        return last_refresh >= last_market_close(now).timestamp()
+
+    # --- PUBLIC API ---
+    def get_history(self, ticker: str, period: str = "1mo") -> pd.DataFrame:
+        """
+        Returns daily OHLCV bars for the period, refreshing from Yahoo only
+        what is missing or stale.
+        """
+        start = period_start(period)
+        start_key = start.isoformat() if start else ""
+
+        with span("price_store.get", ticker=ticker, period=period) as s:
+            with self._ticker_lock(ticker):
+                meta = self._read_meta(ticker)
+                if meta is None or meta[0] > start_key:
+                    # Nothing cached, or the cached range starts too late
+                    s["cache"] = "miss"
+                    self._full_refresh(ticker, period, start_key)
+                elif not self.is_fresh(meta[1]):
+                    s["cache"] = "stale"
+                    self._delta_refresh(ticker, meta[0])
+                else:
+                    s["cache"] = "hit"
+
+            bars = self._read_bars(ticker, start_key)
+            s["bars"] = len(bars)
+            return bars
+
+    def has_fresh(self, ticker: str, period: str = "1mo") -> bool:
+        """
+        True if the cached bars cover the period and need no refresh.
+        """
+        start = period_start(period)
+        meta = self._read_meta(ticker)
+        return meta is not None and meta[0] <= (start.isoformat() if start else "") and self.is_fresh(meta[1])
+
+    def put_history(self, ticker: str, data: pd.DataFrame, period: str):
+        """
+        Stores bars that were downloaded elsewhere (e.g., a bulk download)
+        as the full history for the period.
+        """
+        start = period_start(period)
+        with self._ticker_lock(ticker):
+            self._replace(ticker, data, start.isoformat() if start else "")
+
+    # --- INTERNALS ---
+    @staticmethod
+    def _download(ticker: str, mode: str, **kwargs) -> pd.DataFrame:
+        # yfinance is only imported when a refresh actually hits the network
+        import yfinance as yf
+        with span("yfinance.history", ticker=ticker, mode=mode, **kwargs) as s:
+            data = yf.Ticker(ticker).history(**kwargs)
+            s["bars"] = len(data)
+        return data
+
+    def _read_meta(self, ticker: str):
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT covered_from, last_refresh FROM meta WHERE ticker = ?", (ticker,)
+            ).fetchone()
+
+    def _full_refresh(self, ticker: str, period: str, start_key: str):
+        data = self._download(ticker, "full", period=period)
+        if not data.empty:
+            self._replace(ticker, data, start_key)
+
+    def _delta_refresh(self, ticker: str, covered_from: str):
+        with self._connect() as conn:
+            last_date = conn.execute(
+                "SELECT MAX(date) FROM bars WHERE ticker = ?", (ticker,)
+            ).fetchone()[0]
+        # Re-fetch the last cached bar too: it may have been an intraday partial
+        delta = self._download(ticker, "delta", start=last_date)
+        if delta.empty:
+            self._touch(ticker)
+            return
+        new_bars = delta[delta.index.strftime('%Y-%m-%d') > last_date]
+        actions = [c for c in ('Dividends', 'Stock Splits') if c in delta.columns]
+        if actions and (new_bars[actions] != 0).any().any():
+            # Corporate action: the adjusted history on disk is no longer valid
+            start = covered_from or None
+            data = self._download(ticker, "reload", start=start) if start else self._download(ticker, "reload", period="max")
+            self._replace(ticker, data, covered_from)
+            return
+        self._upsert(ticker, delta)
+        self._touch(ticker)
+
+    def _replace(self, ticker: str, data: pd.DataFrame, covered_from: str):
+        # Single transaction so readers never observe a half-written ticker
+        with self._connect() as conn:
+            conn.execute("DELETE FROM bars WHERE ticker = ?", (ticker,))
+            conn.executemany("INSERT OR REPLACE INTO bars VALUES (?, ?, ?, ?, ?, ?, ?)", self._rows(ticker, data))
+            conn.execute(
+                "INSERT OR REPLACE INTO meta (ticker, covered_from, last_refresh) VALUES (?, ?, ?)",
+                (ticker, covered_from, time.time()),
+            )
+
+    @staticmethod
+    def _rows(ticker: str, data: pd.DataFrame) -> list:
+        bars = data[OHLCV_COLUMNS].dropna(subset=['Close'])
+        return [
+            (ticker, idx.strftime('%Y-%m-%d'), float(r.Open), float(r.High), float(r.Low), float(r.Close), float(r.Volume or 0))
+            for idx, r in bars.iterrows()
+        ]
+
+    def _upsert(self, ticker: str, data: pd.DataFrame):
+        with self._connect() as conn:
+            conn.executemany("INSERT OR REPLACE INTO bars VALUES (?, ?, ?, ?, ?, ?, ?)", self._rows(ticker, data))
+
+    def _touch(self, ticker: str):
+        with self._connect() as conn:
+            conn.execute("UPDATE meta SET last_refresh = ? WHERE ticker = ?", (time.time(), ticker))
+
+    def _read_bars(self, ticker: str, start_key: str) -> pd.DataFrame:
+        with self._connect() as conn:
+            data = pd.read_sql_query(
+                "SELECT date, open, high, low, close, volume FROM bars "
+                "WHERE ticker = ? AND date >= ? ORDER BY date",
+                conn, params=(ticker, start_key),
+            )
+        data.columns = ['Date'] + OHLCV_COLUMNS
+        # Match the tz-aware DatetimeIndex that yfinance returns
+        data.index = pd.DatetimeIndex(pd.to_datetime(data.pop('Date')), name='Date').tz_localize(MARKET_TZ)
+        data['Volume'] = data['Volume'].fillna(0).astype('int64')
+        return data
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_price_store():
+    """
+    Returns the process-wide price store, or None if disabled
+    (set PRICE_STORE_PATH to an empty string to bypass the cache).
+    """
+    global _store
+    path = os.getenv("PRICE_STORE_PATH", os.path.join(".cache", "prices.sqlite"))
+    if not path:
+        return None
+    with _store_lock:
+        if _store is None or _store.path != path:
+            _store = PriceStore(path)
+        return _store
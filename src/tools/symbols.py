@@ -0,0 +1,241 @@
+# src/tools/symbols.py
+"""
+Local index of listed US symbols.
+
+Built from the Nasdaq Trader symbol directory (every Nasdaq, NYSE, NYSE
+American, NYSE Arca and Cboe listing) and stored in SYMBOLS_PATH. It is
+loaded once per process and rebuilt in the background when older than
+SYMBOLS_MAX_AGE (or built there on first use, when there is no file yet).
+Lookups are in memory:
+
+    index = get_symbol_index()
+    index.resolve("xp inc")     # 'XP'  (symbol, or company name)
+    index.search("nvi")         # [('NVDA', 'NVIDIA Corporation'), ...]
+    index.suggest("NVDAA")      # ['NVDA', ...] close matches for a typo
+
+Only US stock listings are indexed. Other Yahoo symbols (indices like
+^GSPC, currencies like EURUSD=X, crypto like BTC-USD, OTC listings like
+TCEHY, foreign listings like PETR4.SA) are not in it: callers ask Yahoo
+for those (see yahoo_spellings), as they do while the index is not built.
+
+Rebuild on a schedule (e.g. a daily cron) with:
+    python -m src.tools.symbols
+"""
+import bisect
+import difflib
+import json
+import os
+import re
+import threading
+import time
+
+SYMBOLS_PATH = os.getenv("SYMBOLS_PATH", os.path.join(".cache", "symbols.json"))
+# The index is rebuilt (in the background) once older than this (seconds)
+SYMBOLS_MAX_AGE = float(os.getenv("SYMBOLS_MAX_AGE", str(7 * 86400)))
+
+SOURCES = [
+    # (url, symbol column, name column)
+    ("https://www.nasdaqtrader.com/dynamic/SymDir/nasdaqlisted.txt", "Symbol", "Security Name"),
+    ("https://www.nasdaqtrader.com/dynamic/SymDir/otherlisted.txt", "ACT Symbol", "Security Name"),
+]
+
+# Company-name matching: the name ends at the first legal form or share
+# description ('Tesla, Inc. Common Stock' -> 'tesla'); filler words are dropped
+LEGAL_FORMS = {
+    "inc", "incorporated", "corp", "corporation", "co", "company", "ltd", "limited",
+    "plc", "sa", "ag", "nv", "se", "lp", "llc",
+}
+SHARE_WORDS = {"common", "ordinary", "class", "american", "depositary", "shares", "stock", "units", "warrants", "preferred"}
+FILLER_WORDS = {"the", "holding", "holdings", "group"}
+
+
+def yahoo_spellings(raw: str) -> list:
+    """
+    Symbols to ask Yahoo for input that is not in the index: as typed
+    ('^GSPC', 'EURUSD=X', 'PETR4.SA'), then with share-class dashes
+    ('BRK.B' -> 'BRK-B'). Empty for input that cannot be a symbol
+    (e.g. a company name with spaces).
+    """
+    symbol = raw.strip().upper()
+    if not re.fullmatch(r"\^?[A-Z0-9&./=-]{1,20}", symbol):
+        return []
+    return list(dict.fromkeys([symbol, normalize_symbol(symbol)]))
+
+
+def normalize_symbol(raw: str) -> str:
+    # Yahoo writes share classes with a dash: BRK.B / BRK/B -> BRK-B
+    return re.sub(r"[./]", "-", raw.strip().upper())
+
+
+def normalize_name(name: str) -> str:
+    """
+    Lower-case company name without punctuation, legal form or the
+    security description ('Apple Inc. - Common Stock' -> 'apple').
+    """
+    words = re.findall(r"[a-z0-9]+", name.split(" - ")[0].lower().replace("&", " and "))
+    end = next((i for i, w in enumerate(words) if i > 0 and (w in LEGAL_FORMS or w in SHARE_WORDS)), len(words))
+    return " ".join(w for w in words[:end] if w not in FILLER_WORDS and w not in LEGAL_FORMS)
+
+
+class SymbolIndex:
+    """
+    In-memory symbol table: O(1) exact lookup by symbol or normalized company
+    name, and O(log n) prefix search over symbols and company-name words.
+    """
+
+    def __init__(self, entries: dict):
+        self.names = entries  # symbol -> security name
+        self._by_name = {}
+        words = set()
+        for symbol, name in entries.items():
+            key = normalize_name(name)
+            # Several listings can share a name (share classes): keep the shortest symbol
+            if key and (key not in self._by_name or len(symbol) < len(self._by_name[key])):
+                self._by_name[key] = symbol
+            words.update((word, symbol) for word in key.split())
+        self._symbols = sorted(entries)
+        self._words = sorted(words)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, symbol: str):
+        return normalize_symbol(symbol) in self.names
+
+    def resolve(self, raw: str):
+        """
+        The listed symbol for user input (a symbol or a company name), or None.
+        """
+        symbol = normalize_symbol(raw)
+        if symbol in self.names:
+            return symbol
+        return self._by_name.get(normalize_name(raw))
+
+    def search(self, query: str, limit: int = 10) -> list:
+        """
+        (symbol, name) pairs whose symbol, then company-name words, start with query.
+        """
+        results = []
+        prefix = normalize_symbol(query)
+        if prefix:
+            i = bisect.bisect_left(self._symbols, prefix)
+            while i < len(self._symbols) and self._symbols[i].startswith(prefix) and len(results) < limit:
+                results.append(self._symbols[i])
+                i += 1
+        word = normalize_name(query)
+        if word:
+            i = bisect.bisect_left(self._words, (word, ""))
+            while i < len(self._words) and self._words[i][0].startswith(word) and len(results) < limit:
+                if self._words[i][1] not in results:
+                    results.append(self._words[i][1])
+                i += 1
+        return [(symbol, self.names[symbol]) for symbol in results]
+
+    def suggest(self, raw: str, limit: int = 3) -> list:
+        """
+        Listed symbols closest to a mistyped one.
+        """
+        return difflib.get_close_matches(normalize_symbol(raw), self._symbols, n=limit, cutoff=0.6)
+
+
+def download_symbols() -> dict:
+    """
+    Fetches the Nasdaq Trader symbol files. Returns symbol -> security name
+    (Yahoo spelling), without test issues.
+    """
+    # Imported here: only a rebuild needs it (urllib.request pulls in ssl and http)
+    import urllib.request
+
+    entries = {}
+    for url, symbol_column, name_column in SOURCES:
+        with urllib.request.urlopen(url, timeout=30) as response:
+            lines = response.read().decode("utf-8", errors="replace").splitlines()
+        header = lines[0].split("|")
+        for line in lines[1:]:
+            if line.startswith("File Creation Time"):
+                continue
+            row = dict(zip(header, line.split("|")))
+            if row.get("Test Issue") == "Y" or not row.get(symbol_column):
+                continue
+            entries[normalize_symbol(row[symbol_column])] = row.get(name_column, "").strip()
+    return entries
+
+
+def build_index(path: str = SYMBOLS_PATH) -> SymbolIndex:
+    """
+    Downloads the symbol lists and writes them to path.
+    """
+    print("[SYMBOLS] Rebuilding symbol index...")
+    entries = download_symbols()
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # Write then rename: readers in other processes never see a partial file
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(entries, f, separators=(",", ":"))
+    os.replace(tmp, path)
+    print(f"[SYMBOLS] Indexed {len(entries)} symbols")
+    return SymbolIndex(entries)
+
+
+def load_index(path: str = SYMBOLS_PATH):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return SymbolIndex(json.load(f))
+    except (OSError, ValueError):
+        return None
+
+
+# After a failed download, wait this long before trying again (seconds)
+RETRY_INTERVAL = 300
+
+_index = None
+_index_mtime = 0.0
+_index_lock = threading.Lock()
+_rebuilding = False
+_retry_at = 0.0
+
+
+def _mtime(path: str) -> float:
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return 0.0
+
+
+def _rebuild_in_background():
+    global _rebuilding, _retry_at
+    try:
+        build_index()
+    except Exception as e:
+        print(f"[WARNING] Symbol index rebuild failed: {e}")
+        _retry_at = time.time() + RETRY_INTERVAL
+    finally:
+        _rebuilding = False
+
+
+def get_symbol_index():
+    """
+    The process-wide symbol index, loaded on first use and reloaded when
+    the file is rebuilt (by this or another process). A missing or stale
+    index is (re)built by a background thread, so a request never waits
+    for the download. Returns None until there is an index (callers then
+    fall back to asking Yahoo).
+    """
+    global _index, _index_mtime, _rebuilding
+    with _index_lock:
+        mtime = _mtime(SYMBOLS_PATH)
+        if mtime > _index_mtime:
+            index = load_index()
+            if index is not None:
+                _index, _index_mtime = index, mtime
+        # A missing index has mtime 0, so it counts as stale
+        if time.time() - _index_mtime > SYMBOLS_MAX_AGE and not _rebuilding and time.time() >= _retry_at:
+            _rebuilding = True
+            threading.Thread(target=_rebuild_in_background, name="symbol-index", daemon=True).start()
+        return _index
+
+
+if __name__ == "__main__":
+    build_index()
@@ -1,9 +1,9 @@
 # streamlit_app.py
 import streamlit as st
-import os
-import yfinance as yf
-from src.graph import app
-from src.pdf_generator import create_pdf
+import time
+from src.jobs import get_job_queue
+from src.tools.market_data import fetch_snapshot
+from src.tools.symbols import get_symbol_index, yahoo_spellings
 
 # --- PAGE CONFIGURATION ---
 st.set_page_config(
@@ -447,17 +447,88 @@ def render_agent_card(placeholder, number, role, name, status="waiting", log="Wa
     placeholder.markdown(html, unsafe_allow_html=True)
 
 
+def render_live_report(placeholder, ticker, text):
+    """Renders the Writer's partial output while it is still streaming."""
+    placeholder.markdown(f"""
+    <div class="results-section">
+        <h2 class="results-header">{ticker} <span>Analysis Report</span></h2>
+        <div class="report-section">
+            <div class="report-title">Investment Thesis (writing...)</div>
+            <div class="report-content">{text}</div>
+        </div>
+    </div>
+    """, unsafe_allow_html=True)
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def build_pdf(ticker, report, chart):
+    """Builds the report PDF in memory, once per report version."""
+    from src.pdf_generator import create_pdf  # fpdf2 is only needed once a report exists
+    return create_pdf(ticker, report, None, chart)
+
+
+def render_diagnostics(placeholder, spans):
+    """Per-stage and per-call timings of the last run, with cache and token details."""
+    if not spans:
+        return
+    with placeholder.container():
+        # Wall-clock time from the first span start to the last span end
+        total = max(s["ts"] * 1000 + s["duration_ms"] for s in spans) - min(s["ts"] * 1000 for s in spans)
+        stages = {s["name"]: s["duration_ms"] for s in spans}
+        cols = st.columns(4)
+        cols[0].metric("Total", f"{total / 1000:.2f}s")
+        for col, name in zip(cols[1:], ("researcher", "analyst", "writer")):
+            col.metric(name.title(), f"{stages.get(name, 0) / 1000:.2f}s")
+        columns = ["name", "duration_ms", "cache", "prompt_tokens", "completion_tokens", "first_token_ms", "ticker", "error"]
+        st.dataframe(
+            [{c: s.get(c) for c in columns} for s in spans],
+            use_container_width=True, hide_index=True
+        )
+
+
 def validate_ticker(ticker):
-    try:
-        info = yf.Ticker(ticker).history(period="1d")
-        return not info.empty
-    except:
-        return False
+    """
+    The symbol for the input (a symbol or a company name), or None.
+    Listed US symbols are answered in memory from the local symbol index.
+    Anything else (^GSPC, BTC-USD, PETR4.SA, or any input while the index
+    is being built) is checked with Yahoo.
+    """
+    index = get_symbol_index()
+    symbol = index.resolve(ticker) if index is not None else None
+    if symbol:
+        return symbol
+    return next((s for s in yahoo_spellings(ticker) if fetch_snapshot(s).is_valid), None)
+
+
+def ticker_suggestions(ticker):
+    """'Did you mean' candidates for an unknown ticker: close symbols, then name matches."""
+    index = get_symbol_index()
+    if index is None:
+        return []
+    symbols = index.suggest(ticker) + [symbol for symbol, _ in index.search(ticker, limit=5)]
+    return [(s, index.names[s]) for s in dict.fromkeys(symbols)][:5]
+
+
+def render_job_cards(job):
+    """Agent cards for a background job's per-stage state."""
+    if job["status"] == "queued":
+        render_agent_card(p1, "01", "Data Acquisition", "The Researcher", "running", "Queued...")
+        render_agent_card(p2, "02", "Quantitative Analysis", "The Analyst", "running", "Queued...")
+        return
+    stages = job["stages"]
+    render_agent_card(p1, "01", "Data Acquisition", "The Researcher", stages["researcher"], "Scanning markets...")
+    render_agent_card(p2, "02", "Quantitative Analysis", "The Analyst", stages["analyst"], "Analyzing data...")
+    render_agent_card(p3, "03", "Final Synthesis", "The Writer", stages["writer"], "Writing report...")
 
 
 # --- SESSION STATE ---
 if "report_data" not in st.session_state:
     st.session_state.report_data = None
+if "job_id" not in st.session_state:
+    st.session_state.job_id = None
+
+# Seconds between job progress checks
+JOB_POLL_INTERVAL = 0.3
 
 
 # --- INPUT SECTION ---
@@ -489,54 +560,75 @@ render_agent_card(p2, "02", "Quantitative Analysis", "The Analyst", "waiting")
 render_agent_card(p3, "03", "Final Synthesis", "The Writer", "waiting")
 st.markdown('</div>', unsafe_allow_html=True)
 
+# --- DIAGNOSTICS (optional) ---
+show_diagnostics = st.toggle("Diagnostics", value=False, help="Stage timings, cache hits and token usage")
+diagnostics = st.empty()
+
 
 # --- WORKFLOW ---
 if submitted and ticker:
-    clean_ticker = ticker.upper().strip()
+    clean_ticker = validate_ticker(ticker)
     
-    if not validate_ticker(clean_ticker):
-        render_agent_card(p1, "01", "Data Acquisition", "The Researcher", "error", f"Invalid ticker: {clean_ticker}")
-        st.markdown(f'<div class="error-msg">Ticker "{clean_ticker}" not found. Please verify the symbol.</div>', unsafe_allow_html=True)
+    if not clean_ticker:
+        render_agent_card(p1, "01", "Data Acquisition", "The Researcher", "error", f"Invalid ticker: {ticker.upper().strip()}")
+        suggestions = ticker_suggestions(ticker)
+        hint = " Did you mean: " + ", ".join(f"{s} ({name})" for s, name in suggestions) + "?" if suggestions else " Please verify the symbol."
+        st.markdown(f'<div class="error-msg">Ticker "{ticker.upper().strip()}" not found.{hint}</div>', unsafe_allow_html=True)
         st.stop()
     
-    render_agent_card(p1, "01", "Data Acquisition", "The Researcher", "running", "Scanning markets...")
-    state = {"ticker": clean_ticker, "messages": []}
-    
-    final_report = ""
-    chart_path = ""
-    metrics = {}
-    
-    try:
-        for chunk in app.stream(state, stream_mode="updates"):
-            for node, output in chunk.items():
-                if node == "researcher":
-                    render_agent_card(p1, "01", "Data Acquisition", "The Researcher", "complete")
-                    render_agent_card(p2, "02", "Quantitative Analysis", "The Analyst", "running", "Analyzing data...")
-                elif node == "analyst":
-                    chart_path = output.get("chart_path")
-                    metrics = output.get("metrics")
-                    render_agent_card(p2, "02", "Quantitative Analysis", "The Analyst", "complete")
-                    render_agent_card(p3, "03", "Final Synthesis", "The Writer", "running", "Writing report...")
-                elif node == "writer":
-                    final_report = output.get("final_report")
-                    render_agent_card(p3, "03", "Final Synthesis", "The Writer", "complete", "Report ready")
+    # The pipeline runs in a worker process; this session only polls its progress
+    job_id = get_job_queue().submit(clean_ticker)
+    st.session_state.job_id = job_id
+    st.session_state.report_data = None
+    # Keeps the job in the URL: a browser refresh re-attaches instead of starting over
+    st.query_params["job"] = job_id
+
+
+# --- JOB PROGRESS ---
+job_id = st.session_state.get("job_id") or st.query_params.get("job")
+if job_id and not st.session_state.report_data:
+    live_report = st.empty()
+    shown_partial = None
+    
+    while True:
+        job = get_job_queue().get(job_id)
+        if job is None:
+            st.session_state.job_id = None
+            st.query_params.clear()
+            st.markdown('<div class="error-msg">This analysis has expired. Please run it again.</div>', unsafe_allow_html=True)
+            st.stop()
         
-        st.session_state.report_data = {
-            "ticker": clean_ticker,
-            "report": final_report,
-            "chart": chart_path,
-            "metrics": metrics
-        }
-    
-    except Exception as e:
-        error_msg = str(e).lower()
-        if "rate limit" in error_msg:
-            render_agent_card(p3, "03", "Final Synthesis", "The Writer", "error", "Rate limited")
-            st.markdown('<div class="error-msg">Rate limit reached. Please wait 30 seconds and try again.</div>', unsafe_allow_html=True)
-        else:
-            render_agent_card(p3, "03", "Final Synthesis", "The Writer", "error", "Error occurred")
-            st.markdown(f'<div class="error-msg">Error: {str(e)}</div>', unsafe_allow_html=True)
-        st.stop()
+        render_job_cards(job)
+        
+        if job["status"] == "done":
+            live_report.empty()
+            st.session_state.job_id = job_id
+            st.session_state.report_data = {
+                "ticker": job["ticker"],
+                "report": job["report"],
+                "chart": job["chart"] or b"",
+                "metrics": job["metrics"] or {},
+                "telemetry": job["telemetry"] or []
+            }
+            break
+        
+        if job["status"] == "error":
+            live_report.empty()
+            error_msg = (job["error"] or "").lower()
+            if "rate limit" in error_msg:
+                render_agent_card(p3, "03", "Final Synthesis", "The Writer", "error", "Rate limited")
+                st.markdown('<div class="error-msg">Rate limit reached. Please wait 30 seconds and try again.</div>', unsafe_allow_html=True)
+            else:
+                render_agent_card(p3, "03", "Final Synthesis", "The Writer", "error", "Error occurred")
+                st.markdown(f'<div class="error-msg">Error: {job["error"]}</div>', unsafe_allow_html=True)
+            st.session_state.job_id = None
+            st.query_params.clear()
+            st.stop()
+        
+        if job["partial_report"] and job["partial_report"] != shown_partial:
+            render_live_report(live_report, job["ticker"], job["partial_report"])
+            shown_partial = job["partial_report"]
+        time.sleep(JOB_POLL_INTERVAL)
 
 
 # --- RESULTS ---
@@ -546,6 +638,8 @@ if st.session_state.report_data:
     render_agent_card(p1, "01", "Data Acquisition", "The Researcher", "complete")
     render_agent_card(p2, "02", "Quantitative Analysis", "The Analyst", "complete")
     render_agent_card(p3, "03", "Final Synthesis", "The Writer", "complete")
+    if show_diagnostics:
+        render_diagnostics(diagnostics, data.get("telemetry", []))
     
     st.markdown(f"""
     <div class="results-section">
@@ -588,27 +682,26 @@ if st.session_state.report_data:
         """, unsafe_allow_html=True)
     
     with col2:
-        if data["chart"] and os.path.exists(data["chart"]):
+        if data["chart"]:
             st.markdown('<div class="chart-container"><div class="chart-title">Technical Analysis</div>', unsafe_allow_html=True)
             st.image(data["chart"], use_container_width=True)
             st.markdown('</div>', unsafe_allow_html=True)
         
-        # PDF Download
+        # PDF Download (cached: reruns and clicks reuse the same buffer)
         pdf_name = f"{data['ticker']}_Report.pdf"
-        create_pdf(data['ticker'], data['report'], pdf_name, data['chart'])
-        
-        with open(pdf_name, "rb") as f:
-            st.download_button(
-                label="Download PDF",
-                data=f,
-                file_name=pdf_name,
-                mime="application/pdf",
-                type="primary",
-                use_container_width=True
-            )
+        st.download_button(
+            label="Download PDF",
+            data=build_pdf(data['ticker'], data['report'], data['chart']),
+            file_name=pdf_name,
+            mime="application/pdf",
+            type="primary",
+            use_container_width=True
+        )
         
         if st.button("New Analysis", type="secondary", use_container_width=True):
             st.session_state.report_data = None
+            st.session_state.job_id = None
+            st.query_params.clear()
             st.rerun()
     
     st.markdown('</div>', unsafe_allow_html=True)
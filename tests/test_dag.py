@@ -0,0 +1,89 @@
+# tests/test_dag.py
+import threading
+import time
+
+import pytest
+
+from src.dag import Graph, Node, NodeTimeout
+
+
+def test_independent_nodes_run_in_parallel():
+    def slow(key):
+        def fn(x):
+            time.sleep(0.2)
+            return {key: x}
+        return fn
+
+    graph = Graph([
+        Node("join", lambda a, b: {"c": a + b}, inputs=["a", "b"], outputs=["c"]),
+        Node("a", slow("a"), inputs=["x"], outputs=["a"]),
+        Node("b", slow("b"), inputs=["x"], outputs=["b"]),
+    ])
+    start = time.monotonic()
+    assert graph.invoke({"x": 1})["c"] == 2
+    assert time.monotonic() - start < 0.35
+
+
+def test_generator_nodes_stream_partial_updates():
+    def writer(x):
+        for i in range(3):
+            yield {"partial": i}
+        return {"y": x}
+
+    updates = list(Graph([Node("w", writer, inputs=["x"], outputs=["y"])]).stream({"x": 5}))
+    assert updates == [{"w": {"partial": 0}}, {"w": {"partial": 1}}, {"w": {"partial": 2}}, {"w": {"y": 5}}]
+
+
+def test_raised_errors_are_retried():
+    calls = []
+
+    def flaky(x):
+        calls.append(x)
+        if len(calls) < 2:
+            raise RuntimeError("transient")
+        return {"y": x}
+
+    graph = Graph([Node("flaky", flaky, inputs=["x"], outputs=["y"], retries=1, backoff=0.01)])
+    assert graph.invoke({"x": 1})["y"] == 1
+    assert len(calls) == 2
+
+
+def test_timeout_is_not_retried_behind_the_abandoned_attempt():
+    # The hung attempt keeps holding its lock (like search_news's per-query
+    # lock or a service semaphore): a retry could only queue behind it
+    lock = threading.Lock()
+    release = threading.Event()
+    calls = []
+
+    def hung(x):
+        calls.append(x)
+        with lock:
+            release.wait(5)
+        return {"y": "late"}
+
+    graph = Graph([Node(
+        "hung", hung, inputs=["x"], outputs=["y"], timeout=0.2, retries=1, backoff=0.01,
+        fallback=lambda error, x: {"y": type(error).__name__},
+    )])
+    start = time.monotonic()
+    try:
+        assert graph.invoke({"x": 1})["y"] == "NodeTimeout"
+        assert time.monotonic() - start < 1
+        assert len(calls) == 1
+    finally:
+        release.set()
+
+
+def test_timeout_without_fallback_raises():
+    graph = Graph([Node("hung", lambda x: time.sleep(1) or {"y": x}, inputs=["x"], outputs=["y"], timeout=0.1)])
+    with pytest.raises(NodeTimeout):
+        graph.invoke({"x": 1})
+
+
+def test_invalid_graphs_are_rejected():
+    with pytest.raises(ValueError, match="Cycle"):
+        Graph([Node("p", dict, inputs=["q"], outputs=["r"]), Node("q", dict, inputs=["r"], outputs=["q"])])
+    with pytest.raises(ValueError, match="produced by both"):
+        Graph([Node("p", dict, inputs=["x"], outputs=["y"]), Node("q", dict, inputs=["x"], outputs=["y"])])
+    with pytest.raises(ValueError, match="Missing graph inputs"):
+        Graph([Node("p", dict, inputs=["x"], outputs=["y"])]).invoke({})
@@ -0,0 +1,88 @@
+# tests/test_graph.py
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.graph import _Flight
+
+
+def _run_flight(flight, updates, error=None, delay=0.05):
+    def run():
+        for update in updates:
+            time.sleep(delay)
+            flight.publish(update)
+        flight.finish(error)
+    threading.Thread(target=run, daemon=True).start()
+
+
+def test_async_followers_get_every_update_without_holding_a_thread():
+    flight = _Flight(("T", "1mo", "1d"))
+    updates = [{"researcher": {"news_summary": "n"}}, {"analyst": {"metrics": {}}}, {"writer": {"final_report": "r"}}]
+
+    async def main():
+        async def follow():
+            return [u async for u in flight.afollow()]
+
+        async def probe():
+            # The default executor stays free while followers wait
+            await asyncio.sleep(0.02)
+            start = time.monotonic()
+            await asyncio.to_thread(lambda: None)
+            return time.monotonic() - start
+
+        _run_flight(flight, updates)
+        return await asyncio.gather(probe(), *(follow() for _ in range(64)))
+
+    waited, *followed = asyncio.run(main())
+    assert waited < 0.05
+    assert all(f == updates for f in followed)
+
+
+def test_async_followers_get_the_run_error():
+    flight = _Flight(("T", "1mo", "1d"))
+
+    async def follow():
+        return [u async for u in flight.afollow()]
+
+    _run_flight(flight, [{"researcher": {"news_summary": "n"}}], error=RuntimeError("boom"))
+    with pytest.raises(RuntimeError, match="boom"):
+        asyncio.run(follow())
+
+
+def _report_updates(chunks):
+    text = ""
+    updates = [{"researcher": {"news_summary": "n"}}, {"analyst": {"metrics": {}}}]
+    for i in range(chunks):
+        text += f"token{i} "
+        updates.append({"writer": {"partial_report": text}})
+    return updates + [{"writer": {"final_report": text}}]
+
+
+def test_flight_keeps_only_the_latest_partial():
+    flight = _Flight(("T", "1mo", "1d"))
+    for update in _report_updates(1500):
+        flight.publish(update)
+    flight.finish()
+
+    assert len(flight.updates) == 3
+    # A late joiner replays the completions and the full text once
+    replayed = list(flight.follow())
+    assert [next(iter(u.values())).keys() for u in replayed] == [
+        {"news_summary"}, {"metrics"}, {"partial_report"}, {"final_report"},
+    ]
+    assert replayed[2]["writer"]["partial_report"] == replayed[3]["writer"]["final_report"]
+
+
+def test_live_followers_see_growing_partials_before_the_final_report():
+    flight = _Flight(("T", "1mo", "1d"))
+    updates = _report_updates(20)
+    _run_flight(flight, updates, delay=0.001)
+    followed = list(flight.follow())
+
+    partials = [u["writer"]["partial_report"] for u in followed if "partial_report" in u.get("writer", {})]
+    assert followed[:2] == updates[:2]
+    assert followed[-1] == updates[-1]
+    assert partials[-1] == updates[-1]["writer"]["final_report"]
+    assert all(later.startswith(earlier) for earlier, later in zip(partials, partials[1:]))
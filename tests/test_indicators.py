@@ -0,0 +1,55 @@
+# tests/test_indicators.py
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.tools.indicators import compute_indicators
+
+
+def make_history(seed: int, bars: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range(end="2026-10-16", periods=bars, name="Date", tz="America/New_York")
+    close = 100 + rng.standard_normal(bars).cumsum()
+    open_ = close + rng.standard_normal(bars) * 0.5
+    return pd.DataFrame({
+        "Open": open_,
+        "High": np.maximum(open_, close) + 1,
+        "Low": np.minimum(open_, close) - 1,
+        "Close": close,
+        "Volume": rng.integers(1_000_000, 5_000_000, bars).astype(float),
+    }, index=index)
+
+
+def assert_same(batch: dict, single: dict):
+    assert batch.keys() == single.keys()
+    for name, value in single.items():
+        if math.isnan(value):
+            assert math.isnan(batch[name]), name
+        else:
+            assert batch[name] == pytest.approx(value), name
+
+
+def test_batch_matches_single_ticker_when_sessions_differ():
+    full = make_history(1, 60)
+    # Missing one session the other ticker traded (holiday on another exchange, halt)
+    gappy = make_history(2, 60).drop(make_history(2, 60).index[30])
+    # Shorter history than the longest window
+    short = make_history(3, 10)
+    histories = {"FULL": full, "GAPPY": gappy, "SHORT": short}
+
+    batch = compute_indicators(histories)
+    for ticker, history in histories.items():
+        assert_same(batch[ticker], compute_indicators({ticker: history})[ticker])
+
+    assert not math.isnan(batch["GAPPY"]["sma_20"])
+    assert not math.isnan(batch["GAPPY"]["bb_upper"])
+    assert math.isnan(batch["SHORT"]["sma_20"])
+    assert math.isnan(batch["SHORT"]["rsi_14"])
+
+
+def test_sma_uses_the_last_twenty_sessions():
+    history = make_history(4, 40)
+    values = compute_indicators({"X": history})["X"]
+    assert values["sma_20"] == pytest.approx(history["Close"].iloc[-20:].mean())
@@ -0,0 +1,55 @@
+# tests/test_jobs.py
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+from src.jobs import JobQueue
+
+
+class FakePool:
+    """
+    Records submitted jobs; broken=True behaves like a pool whose worker died.
+    """
+
+    def __init__(self, broken=False, crash_jobs=False):
+        self.broken = broken
+        self.crash_jobs = crash_jobs
+        self.jobs = []
+
+    def submit(self, fn, *args):
+        if self.broken:
+            raise BrokenProcessPool("A child process terminated abruptly")
+        self.jobs.append(args)
+        future = Future()
+        if self.crash_jobs:
+            future.set_exception(BrokenProcessPool("A child process terminated abruptly"))
+        else:
+            future.set_result(None)
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        pass
+
+
+def make_queue(monkeypatch, tmp_path, pools):
+    monkeypatch.setattr(JobQueue, "_new_pool", lambda self: pools.pop(0))
+    return JobQueue(max_workers=1, path=str(tmp_path / "jobs.sqlite"))
+
+
+def test_submit_replaces_a_broken_pool(monkeypatch, tmp_path):
+    fresh = FakePool()
+    queue = make_queue(monkeypatch, tmp_path, [FakePool(broken=True), fresh])
+    job_id = queue.submit("AAPL")
+    assert [args[0] for args in fresh.jobs] == [job_id]
+    assert queue._pool is fresh
+
+
+def test_job_on_a_crashed_pool_is_resubmitted_once(monkeypatch, tmp_path):
+    first, second, third = FakePool(crash_jobs=True), FakePool(crash_jobs=True), FakePool()
+    queue = make_queue(monkeypatch, tmp_path, [first, second, third])
+    job_id = queue.submit("AAPL")
+    assert len(first.jobs) == len(second.jobs) == 1
+    assert queue.get(job_id)["status"] == "error"
+    assert "Worker failed" in queue.get(job_id)["error"]
+    # The next submit goes to a working pool
+    queue.submit("MSFT")
+    assert len(third.jobs) == 1
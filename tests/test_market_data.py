@@ -0,0 +1,23 @@
+# tests/test_market_data.py
+from src.tools import market_data
+from src.tools.market_data import MarketSnapshot
+
+
+class FailingTicker:
+    def __init__(self):
+        self.calls = 0
+
+    def history(self, **kwargs):
+        self.calls += 1
+        raise ConnectionError("Yahoo is down")
+
+
+def test_failed_history_fetch_is_not_retried(monkeypatch):
+    monkeypatch.setattr(market_data, "get_price_store", lambda: None)
+    snapshot = MarketSnapshot("NVDA")
+    snapshot._stock = FailingTicker()
+
+    assert not snapshot.is_valid
+    assert snapshot.history.empty
+    assert snapshot.indicators == {}
+    assert snapshot._stock.calls == 1
@@ -0,0 +1,26 @@
+# tests/test_news_search.py
+from src.tools.news_search import deduplicate
+
+
+def test_publisher_suffixes_are_ignored():
+    results = [
+        {"title": "Nvidia beats estimates - Reuters", "href": "https://reuters.com/a"},
+        {"title": "Nvidia Beats Estimates | Yahoo Finance", "href": "https://finance.yahoo.com/b"},
+    ]
+    assert deduplicate(results) == results[:1]
+
+
+def test_headlines_after_a_dash_are_kept():
+    results = [
+        {"title": "NVDA Stock - Why Shares Are Rising Today", "href": "https://example.com/a"},
+        {"title": "NVDA Stock - Analysts Cut Price Target After Earnings", "href": "https://example.com/b"},
+    ]
+    assert deduplicate(results) == results
+
+
+def test_duplicate_urls_are_dropped():
+    results = [
+        {"title": "One story", "href": "https://www.example.com/story/"},
+        {"title": "Another title", "href": "https://example.com/story"},
+    ]
+    assert deduplicate(results) == results[:1]
@@ -0,0 +1,11 @@
+# tests/test_pdf_generator.py
+import pytest
+
+from src.pdf_generator import TOC_ENTRIES_PER_PAGE, create_compendium
+
+
+@pytest.mark.parametrize("count", [TOC_ENTRIES_PER_PAGE + 1, 80])
+def test_compendium_table_of_contents_spans_pages(count):
+    reports = [{"ticker": f"T{i:03d}", "final_report": "## Summary\nShort report."} for i in range(count)]
+    pdf = create_compendium(reports, max_workers=2)
+    assert pdf.startswith(b"%PDF")